@@ -15,6 +15,9 @@ from db.models.model_login_session import LoginSession
 from db.models.model_notification import Notification
 from db.models.model_notified_user import NotifiedUser
 from db.models.model_deleted_document import DeletedDocument
+from db.models.model_notification_subscription import NotificationSubscription
+from db.models.model_document_stats import DocumentStatsDaily
+from db.models.model_document_audit_event import DocumentAuditEvent
 
 # Load environment variables
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
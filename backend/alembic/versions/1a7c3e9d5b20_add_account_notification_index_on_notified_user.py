@@ -0,0 +1,29 @@
+"""add (account_id, notification_id) index on notified_user for websocket resume
+
+Revision ID: 1a7c3e9d5b20
+Revises: 342e83332f14
+Create Date: 2025-06-14 10:02:41.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1a7c3e9d5b20'
+down_revision: Union[str, None] = '342e83332f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_notified_user_account_notification', 'notified_user',
+                    ['account_id', 'notification_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notified_user_account_notification', table_name='notified_user')
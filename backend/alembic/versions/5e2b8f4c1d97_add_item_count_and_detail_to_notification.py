@@ -0,0 +1,30 @@
+"""add item_count and detail to notification for coalesced notifications
+
+Revision ID: 5e2b8f4c1d97
+Revises: 1a7c3e9d5b20
+Create Date: 2025-06-14 15:27:09.402551
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b8f4c1d97'
+down_revision: Union[str, None] = '1a7c3e9d5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notification', sa.Column('item_count', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('notification', sa.Column('detail', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('notification', 'detail')
+    op.drop_column('notification', 'item_count')
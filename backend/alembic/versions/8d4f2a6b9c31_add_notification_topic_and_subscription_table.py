@@ -0,0 +1,43 @@
+"""add notification topic and notification_subscription table
+
+Revision ID: 8d4f2a6b9c31
+Revises: 5e2b8f4c1d97
+Create Date: 2025-06-15 11:46:52.730214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4f2a6b9c31'
+down_revision: Union[str, None] = '5e2b8f4c1d97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+notification_topic_enum = postgresql.ENUM(
+    'document_issued', 'document_edited', 'document_deleted', 'document_recovered', 'account_created',
+    name='notification_topic_enum', create_type=False
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    notification_topic_enum.create(op.get_bind(), checkfirst=True)
+    op.add_column('notification', sa.Column('topic', notification_topic_enum, nullable=True))
+    op.create_table('notification_subscription',
+    sa.Column('account_id', sa.BigInteger(), nullable=False),
+    sa.Column('topic', notification_topic_enum, nullable=False),
+    sa.Column('is_subscribed', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['staff_system_acc.account_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('account_id', 'topic')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('notification_subscription')
+    op.drop_column('notification', 'topic')
+    notification_topic_enum.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,35 @@
+"""add generated search_vector column and gin index to document_record for full-text search
+
+Revision ID: a9d3f5c7e210
+Revises: f2c8b6e1a7d3
+Create Date: 2025-06-30 11:47:02.519384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3f5c7e210'
+down_revision: Union[str, None] = 'f2c8b6e1a7d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # a stored generated column is filled for existing rows and kept current on every write
+    op.add_column('document_record', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(
+        "to_tsvector('simple', doc_owner_name || ' ' || replace(doc_owner_ic, '-', ' ') || ' ' "
+        "|| document_type || ' ' || issuer_name)", persisted=True), nullable=True))
+    op.create_index('ix_document_record_search_vector', 'document_record', ['search_vector'], unique=False,
+                    postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_record_search_vector', table_name='document_record', postgresql_using='gin')
+    op.drop_column('document_record', 'search_vector')
@@ -0,0 +1,30 @@
+"""add hash and created_at index on document_record for content-addressed verification
+
+Revision ID: b3e7c1a9f046
+Revises: 8d4f2a6b9c31
+Create Date: 2025-06-18 09:31:27.905113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e7c1a9f046'
+down_revision: Union[str, None] = '8d4f2a6b9c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_document_record_hash', 'document_record', ['hash'], unique=False)
+    op.create_index('ix_document_record_created_at', 'document_record', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_record_created_at', table_name='document_record')
+    op.drop_index('ix_document_record_hash', table_name='document_record')
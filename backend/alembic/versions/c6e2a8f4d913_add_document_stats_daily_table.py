@@ -0,0 +1,46 @@
+"""add document_stats_daily rollup table
+
+Revision ID: c6e2a8f4d913
+Revises: a9d3f5c7e210
+Create Date: 2025-07-03 16:22:38.104957
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e2a8f4d913'
+down_revision: Union[str, None] = 'a9d3f5c7e210'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('document_stats_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('document_type', sa.String(), nullable=False),
+    sa.Column('issuer_id', sa.BigInteger(), nullable=False),
+    sa.Column('is_deleted', sa.Boolean(), nullable=False),
+    sa.Column('doc_count', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['issuer_id'], ['staff_system_acc.account_id'], ),
+    sa.PrimaryKeyConstraint('day', 'document_type', 'issuer_id', 'is_deleted')
+    )
+    op.create_index('ix_document_stats_daily_issuer_day', 'document_stats_daily', ['issuer_id', 'day'], unique=False)
+    # initial fill from the existing documents
+    op.execute("""
+        INSERT INTO document_stats_daily (day, document_type, issuer_id, is_deleted, doc_count)
+        SELECT (created_at AT TIME ZONE 'Asia/Kuala_Lumpur')::date, document_type, issuer_id,
+               is_deleted IS TRUE, count(*)
+        FROM document_record
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_stats_daily_issuer_day', table_name='document_stats_daily')
+    op.drop_table('document_stats_daily')
@@ -0,0 +1,63 @@
+"""add append-only document_audit_event table
+
+Revision ID: d81f4b6a2c57
+Revises: c6e2a8f4d913
+Create Date: 2025-07-05 10:14:51.602318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f4b6a2c57'
+down_revision: Union[str, None] = 'c6e2a8f4d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+audit_event_type_enum = postgresql.ENUM(
+    'create', 'edit', 'delete', 'recover', 'verify',
+    name='audit_event_type_enum', create_type=False
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    audit_event_type_enum.create(op.get_bind(), checkfirst=True)
+    op.create_table('document_audit_event',
+    sa.Column('event_id', sa.BigInteger(), nullable=False),
+    sa.Column('event_type', audit_event_type_enum, nullable=False),
+    sa.Column('doc_record_id', sa.UUID(), nullable=True),
+    sa.Column('actor_id', sa.BigInteger(), nullable=True),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('detail', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.ForeignKeyConstraint(['actor_id'], ['staff_system_acc.account_id'], ),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+    op.create_index('ix_document_audit_event_doc_event', 'document_audit_event', ['doc_record_id', 'event_id'], unique=False)
+    op.create_index('ix_document_audit_event_actor_event', 'document_audit_event', ['actor_id', 'event_id'], unique=False)
+    # append-only: history rows can be added, never changed or removed
+    op.execute("""
+        CREATE FUNCTION document_audit_event_append_only() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION 'document_audit_event is append-only';
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER document_audit_event_append_only
+        BEFORE UPDATE OR DELETE OR TRUNCATE ON document_audit_event
+        FOR EACH STATEMENT EXECUTE FUNCTION document_audit_event_append_only()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER document_audit_event_append_only ON document_audit_event")
+    op.execute("DROP FUNCTION document_audit_event_append_only()")
+    op.drop_index('ix_document_audit_event_actor_event', table_name='document_audit_event')
+    op.drop_index('ix_document_audit_event_doc_event', table_name='document_audit_event')
+    op.drop_table('document_audit_event')
+    audit_event_type_enum.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,29 @@
+"""add partial deleted_at index on document_record trash for the retention worker
+
+Revision ID: e4a1d7c2b859
+Revises: b3e7c1a9f046
+Create Date: 2025-06-24 10:12:44.318206
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a1d7c2b859'
+down_revision: Union[str, None] = 'b3e7c1a9f046'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_document_record_trash_deleted_at', 'document_record', ['deleted_at'], unique=False,
+                    postgresql_where=sa.text('is_deleted IS TRUE'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_record_trash_deleted_at', table_name='document_record')
@@ -0,0 +1,29 @@
+"""add (issuer_id, created_at desc) index on document_record for recent documents per issuer
+
+Revision ID: f2c8b6e1a7d3
+Revises: e4a1d7c2b859
+Create Date: 2025-06-26 14:05:19.642871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8b6e1a7d3'
+down_revision: Union[str, None] = 'e4a1d7c2b859'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_document_record_issuer_created_at', 'document_record',
+                    ['issuer_id', sa.text('created_at DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_record_issuer_created_at', table_name='document_record')
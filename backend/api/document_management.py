@@ -0,0 +1,776 @@
+import asyncio
+import json
+import uuid
+import zipfile
+from concurrent.futures import as_completed
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Body, Form, Depends, File, HTTPException, Query, UploadFile, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from db.case_specified_crud import (get_full_name_by_account_id, get_owner_full_names, get_document_by_hash,
+                                   get_documents_by_hashes, list_documents, search_documents,
+                                   set_documents_deleted)
+from db.audit_log import audit_log, list_audit_events
+from db.database import get_db, SessionLocal
+from db.document_stats import query_stats, record_created
+from db.models.models_document_record import DocumentRecord
+from db.models.model_document_audit_event import AuditEventType
+from db.models.model_notification_subscription import NotificationTopic
+from document_processor.digest_index import issued_digests
+from document_processor.document_view import serve_document, serve_stream, serve_thumbnail, thumbnail_not_modified
+from document_processor.id_codec import decode_doc_id, encode_doc_id, get_id_codec
+from document_processor.hash_processor import stream_hashed_form
+from document_processor.document_storage import get_document_storage
+from document_processor.recent_documents import recent_documents
+from document_processor.registry_export import EXPORT_FORMATS, iter_export
+from document_processor.issuance import (build_verification_url, extract_member, get_stamping_pool,
+                                         new_work_dir, parse_manifest, remove_work_dir, stamp_and_hash)
+from document_processor.signing_engine import get_signing_engine
+from document_processor.thumbnails import THUMBNAIL_SUFFIX, queue_thumbnails, request_thumbnail, thumbnail_version
+from document_processor.verification_cache import verification_cache
+from notification.notification_service import notify_superusers
+
+INSERT_BATCH_SIZE = 200
+MAX_BATCH_VERIFY_ITEMS = 5000
+MAX_BATCH_VERIFY_BYTES = 1024 * 1024 * 1024
+MAX_PAGE_SIZE = 100
+MAX_BULK_STATE_CHANGE = 5000
+THUMBNAIL_RENDER_TIMEOUT = 10
+THUMBNAIL_RETRY_AFTER = 2
+
+NOT_ISSUED = {"status": "invalid", "message": "This document was not issued by this system."}
+BAD_SIGNATURE = {"status": "invalid", "message": "The document signature is not valid."}
+
+router = APIRouter()
+
+
+def _ndjson(payload: dict) -> str:
+    return json.dumps(payload, default=str) + "\n"
+
+
+def _failed(index: int, filename: str, error: str) -> dict:
+    return {"event": "item", "index": index, "filename": filename, "status": "failed", "error": error}
+
+
+def _document_items(rows) -> list:
+    """
+    Response items of a list page, doc_encrypted_id encoded for all rows at
+    once. The plain doc_record_id never leaves the API, the digest only as the
+    thumbnail_version of the thumbnail URL.
+    """
+    encrypted_ids = get_id_codec().encode_many(row.doc_record_id for row in rows)
+    items = []
+    for row, encrypted_id in zip(rows, encrypted_ids):
+        item = dict(row._mapping)
+        del item["doc_record_id"]
+        item["doc_encrypted_id"] = encrypted_id
+        item["thumbnail_version"] = thumbnail_version(bytes(item.pop("hash")))
+        items.append(item)
+    return items
+
+
+@router.get("/get-document")
+def get_document(owner_ic: str,
+                 doc_type: str = "",
+                 page: int = Query(0, ge=0),
+                 limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+                 db: Session = Depends(get_db)):
+    rows, total = list_documents(db, is_deleted=False, owner_ic=owner_ic, doc_type=doc_type,
+                                 offset=page * limit, limit=limit)
+    return {"documents": _document_items(rows), "total": total}
+
+
+@router.get("/get-soft-deleted-document")
+def get_soft_deleted_document(owner_ic: str = "",
+                              doc_type: str = "",
+                              page: int = Query(0, ge=0),
+                              limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+                              db: Session = Depends(get_db)):
+    rows, total = list_documents(db, is_deleted=True, owner_ic=owner_ic, doc_type=doc_type,
+                                 offset=page * limit, limit=limit)
+    return {"documents": _document_items(rows), "total": total}
+
+
+@router.get("/search-documents")
+def search_document(q: str,
+                    doc_type: str = "",
+                    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+                    cursor: str = "",
+                    db: Session = Depends(get_db)):
+    """
+    Ranked search by partial owner name, IC, document type or issuer name.
+    Pass next_cursor back as cursor for the following page, it is null on the last one.
+    """
+    after = None
+    if cursor:
+        try:
+            rank, doc_record_id = cursor.split("_", 1)
+            after = (float(rank), uuid.UUID(doc_record_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    rows = search_documents(db, q, doc_type=doc_type, limit=limit + 1, after=after)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1].rank!r}_{rows[-1].doc_record_id}"
+    return {"documents": _document_items(rows), "next_cursor": next_cursor}
+
+
+@router.get("/document-stats")
+def document_stats(group_by: str = "day",
+                   date_from: Optional[date] = None,
+                   date_to: Optional[date] = None,
+                   document_type: str = "",
+                   issuer_id: Optional[int] = None,
+                   include_deleted: bool = False,
+                   db: Session = Depends(get_db)):
+    """
+    Issuance counts from the document_stats_daily rollup, grouped by a comma
+    separated list of day, document_type and issuer_id. Days are issuance days
+    in Asia/Kuala_Lumpur.
+    """
+    try:
+        return query_stats(db, [column.strip() for column in group_by.split(",") if column.strip()],
+                           date_from=date_from, date_to=date_to, document_type=document_type,
+                           issuer_id=issuer_id, include_deleted=include_deleted)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/audit-events")
+def audit_events(doc_encrypted_id: str = "",
+                 actor_id: Optional[int] = None,
+                 before: Optional[int] = None,
+                 limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+                 db: Session = Depends(get_db)):
+    """
+    Audit history of a document and/or an actor, newest first. Pass the
+    next_before of a page as before to get the next one.
+    """
+    if not doc_encrypted_id and actor_id is None:
+        raise HTTPException(status_code=400, detail="Provide doc_encrypted_id or actor_id.")
+
+    doc_record_id = None
+    if doc_encrypted_id:
+        try:
+            doc_record_id = decode_doc_id(doc_encrypted_id)
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Document not found.")
+
+    events = list_audit_events(db, doc_record_id, actor_id, before, limit)
+    doc_record_ids = list({event.doc_record_id for event in events if event.doc_record_id is not None})
+    tokens = dict(zip(doc_record_ids, get_id_codec().encode_many(doc_record_ids)))
+    return {
+        "events": [
+            {
+                "event_id": event.event_id,
+                "event_type": event.event_type.value,
+                "doc_encrypted_id": tokens.get(event.doc_record_id),
+                "actor_id": event.actor_id,
+                "occurred_at": event.occurred_at,
+                "detail": event.detail,
+            }
+            for event in events
+        ],
+        "next_before": events[-1].event_id if len(events) == limit else None,
+    }
+
+
+@router.get("/export-documents")
+def export_documents(format: str = "csv", gzip: bool = False, include_deleted: bool = False):
+    """
+    Streams the whole document registry as CSV or NDJSON, optionally gzipped,
+    for audit extracts. Memory use does not depend on the number of rows.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"document_registry_{datetime.now(ZoneInfo('Asia/Kuala_Lumpur')):%Y%m%d_%H%M%S}.{format}"
+    if gzip:
+        media_type, filename = "application/gzip", filename + ".gz"
+
+    return StreamingResponse(iter_export(format, gzip, include_deleted), media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+@router.get("/get-processed-docs")
+def get_processed_docs(issuer_id: int, db: Session = Depends(get_db)):
+    """
+    Latest documents issued by an account, for the home page. Served from the
+    per-issuer recent documents cache, the query only runs on a miss.
+    """
+    def load(issuer_id: int, count: int) -> list:
+        rows, _ = list_documents(db, is_deleted=False, issuer_id=issuer_id, limit=count, with_total=False)
+        return _document_items(rows)
+
+    return recent_documents.get(issuer_id, load)
+
+
+@router.delete("/delete/{doc_encrypted_id}")
+def delete_document(doc_encrypted_id: str, account_id: int, db: Session = Depends(get_db)):
+    result = _change_deleted_state(db, [doc_encrypted_id], True, account_id)
+    if result["not_found"]:
+        raise HTTPException(status_code=404, detail="Document not found.")
+    if result["conflicts"]:
+        raise HTTPException(status_code=409, detail="Document is already deleted.")
+    return result
+
+
+@router.post("/delete-documents")
+def delete_documents(encrypted_doc_ids: List[str] = Body(...),
+                     account_id: int = Body(...),
+                     db: Session = Depends(get_db)):
+    return _change_deleted_state(db, encrypted_doc_ids, True, account_id)
+
+
+@router.post("/recover-documents")
+def recover_documents(encrypted_doc_ids: List[str] = Body(...),
+                      account_id: int = Body(...),
+                      db: Session = Depends(get_db)):
+    return _change_deleted_state(db, encrypted_doc_ids, False, account_id)
+
+
+def _change_deleted_state(db: Session, encrypted_doc_ids: List[str], deleted: bool, account_id: int) -> dict:
+    """
+    Soft-deletes or recovers any number of documents in one UPDATE and one
+    transaction, then sends a single summary notification.
+
+    Documents already in the target state are reported as conflicts and ids
+    that do not resolve as not_found, the rest of the batch still goes through.
+    """
+    if not encrypted_doc_ids:
+        raise HTTPException(status_code=400, detail="No documents selected.")
+    if len(encrypted_doc_ids) > MAX_BULK_STATE_CHANGE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_STATE_CHANGE} documents at once.")
+
+    try:
+        actor_name = get_full_name_by_account_id(db, account_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    by_id, not_found = {}, []
+    for encrypted_id in encrypted_doc_ids:
+        try:
+            by_id[decode_doc_id(encrypted_id)] = encrypted_id
+        except ValueError:
+            not_found.append(encrypted_id)
+
+    changed, conflicts, missing = set_documents_deleted(db, by_id.keys(), deleted, account_id)
+    db.commit()
+
+    event_type = AuditEventType.delete if deleted else AuditEventType.recover
+    for row in changed:
+        verification_cache.invalidate_document(row.doc_record_id)
+        audit_log.record(event_type, row.doc_record_id, account_id)
+    for issuer_id in {row.issuer_id for row in changed}:
+        if deleted:
+            recent_documents.remove(issuer_id, get_id_codec().encode_many(row.doc_record_id for row in changed))
+        else:
+            # a recovered document may be newer than what the buffer holds
+            recent_documents.invalidate(issuer_id)
+
+    action = "deleted" if deleted else "recovered"
+    if len(changed) == 1:
+        notify_superusers(f"{changed[0].document_type} of {changed[0].doc_owner_name} was {action} by {actor_name}.", db,
+                          topic=NotificationTopic.document_deleted if deleted else NotificationTopic.document_recovered,
+                          actor_id=account_id, item_ref=by_id[changed[0].doc_record_id],
+                          summary=f"{{count}} documents were {action} by {actor_name}.", coalesce=True)
+    elif changed:
+        notify_superusers(f"{len(changed)} documents were {action} by {actor_name}.", db,
+                          topic=NotificationTopic.document_deleted if deleted else NotificationTopic.document_recovered,
+                          actor_id=account_id)
+
+    return {
+        "message": f"{len(changed)} document(s) {action}.",
+        action: [by_id[row.doc_record_id] for row in changed],
+        "conflicts": [by_id[doc_record_id] for doc_record_id in conflicts],
+        "not_found": not_found + [by_id[doc_record_id] for doc_record_id in missing],
+    }
+
+
+@router.post("/bulk-upload")
+def bulk_upload(issuer_id: int = Form(...),
+                manifest: UploadFile = File(...),
+                archive: UploadFile = File(...),
+                db: Session = Depends(get_db)):
+    """
+    Issues many documents at once from a ZIP of PDFs and a CSV/JSON manifest
+    (filename, doc_owner_ic, doc_type, issue_date per row).
+
+    The response is NDJSON, one line per event: "accepted", one "item" per
+    manifest row (issued or failed, in completion order) and a final "done".
+    A failing row never aborts the rest of the batch.
+    """
+    rows = parse_manifest(manifest)
+
+    try:
+        issuer_name = get_full_name_by_account_id(db, issuer_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    # all owner ICs of the batch in one query
+    owner_names = get_owner_full_names(db, {row["doc_owner_ic"] for row in rows})
+
+    try:
+        zip_file = zipfile.ZipFile(archive.file)
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="Archive is not a valid ZIP file.")
+
+    # the upload is closed once the handler returns, so the PDFs are copied out
+    # before the response starts streaming
+    work_dir = new_work_dir()
+    items, failures = [], []
+    with zip_file:
+        for index, row in enumerate(rows):
+            try:
+                issue_date = date.fromisoformat(row["issue_date"])
+                if not row["doc_type"]:
+                    raise ValueError("doc_type is empty.")
+                if row["doc_owner_ic"] not in owner_names:
+                    raise ValueError("Provided IC does not exist in owner records.")
+                src = extract_member(zip_file, row["filename"], work_dir)
+            except ValueError as e:
+                failures.append(_failed(index, row["filename"], str(e)))
+                continue
+
+            doc_record_id = uuid.uuid4()
+            items.append({
+                "index": index,
+                "filename": row["filename"],
+                "src": src,
+                "doc_record_id": doc_record_id,
+                "verification_url": build_verification_url(doc_record_id),
+                "doc_owner_ic": row["doc_owner_ic"],
+                "doc_owner_name": owner_names[row["doc_owner_ic"]],
+                "document_type": row["doc_type"],
+                "issue_date": issue_date,
+            })
+
+    return StreamingResponse(
+        _bulk_issue(items, failures, len(rows), issuer_id, issuer_name, work_dir),
+        media_type="application/x-ndjson"
+    )
+
+
+def _bulk_issue(items, failures, total, issuer_id, issuer_name, work_dir):
+    """
+    Stamps and hashes the PDFs in the stamping pool, moves them into the
+    document storage, signs them in batches and inserts the DocumentRecord rows
+    INSERT_BATCH_SIZE at a time, yielding one NDJSON line per item as soon as
+    its batch is committed.
+    """
+    # runs after the request session is gone, uses its own
+    db = SessionLocal()
+    pool = get_stamping_pool()
+    storage = get_document_storage()
+    futures = {}
+    issued = 0
+    try:
+        yield _ndjson({"event": "accepted", "total": total})
+        for failure in failures:
+            yield _ndjson(failure)
+
+        futures = {
+            pool.submit(stamp_and_hash, str(item["src"]), str(work_dir / f"{item['doc_record_id']}.pdf"),
+                        item["verification_url"]): item
+            for item in items
+        }
+
+        batch = []
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                item["hash"] = future.result()
+                item["stored_new"] = storage.put_file(work_dir / f"{item['doc_record_id']}.pdf", item["hash"])
+            except Exception as e:
+                print(f"[Bulk Upload Error] Failed to stamp {item['filename']}: {e}")
+                yield _ndjson(_failed(item["index"], item["filename"], "Could not stamp the file, is it a valid PDF?"))
+                continue
+
+            batch.append(item)
+            if len(batch) >= INSERT_BATCH_SIZE:
+                for result in _issue_batch(db, batch, issuer_id, issuer_name):
+                    issued += result["status"] == "issued"
+                    yield _ndjson(result)
+                batch = []
+
+        if batch:
+            for result in _issue_batch(db, batch, issuer_id, issuer_name):
+                issued += result["status"] == "issued"
+                yield _ndjson(result)
+
+        yield _ndjson({"event": "done", "total": total, "issued": issued, "failed": total - issued})
+
+        if issued:
+            notify_superusers(f"{issued} documents were issued by {issuer_name} (bulk upload).", db,
+                              topic=NotificationTopic.document_issued, actor_id=issuer_id)
+    finally:
+        for future in futures:
+            future.cancel()
+        db.close()
+        remove_work_dir(work_dir)
+
+
+def _issued_item(item: dict, issuer_id: int, issuer_name: str) -> dict:
+    """
+    A freshly issued document in the shape of the listing endpoints' items.
+    """
+    return {
+        "doc_owner_name": item["doc_owner_name"],
+        "doc_owner_ic": item["doc_owner_ic"],
+        "document_type": item["document_type"],
+        "issuer_id": issuer_id,
+        "issuer_name": issuer_name,
+        "issue_date": item["issue_date"],
+        "verification_url": item["verification_url"],
+        "is_deleted": False,
+        "deleted_by": None,
+        "deleted_at": None,
+        "deleted_by_name": None,
+        "doc_encrypted_id": encode_doc_id(item["doc_record_id"]),
+        "thumbnail_version": thumbnail_version(item["hash"]),
+    }
+
+
+def _issue_batch(db: Session, batch, issuer_id, issuer_name):
+    """
+    Signs one batch of stamped documents and inserts their rows in one transaction.
+    If the insert fails, the whole batch is reported as failed and its files removed.
+    """
+    try:
+        signatures = get_signing_engine().sign_batch([item["hash"] for item in batch])
+        now = datetime.now(ZoneInfo("Asia/Kuala_Lumpur"))
+
+        db.bulk_insert_mappings(DocumentRecord, [
+            {
+                "doc_record_id": item["doc_record_id"],
+                "doc_owner_name": item["doc_owner_name"],
+                "doc_owner_ic": item["doc_owner_ic"],
+                "document_type": item["document_type"],
+                "issuer_id": issuer_id,
+                "issuer_name": issuer_name,
+                "issue_date": item["issue_date"],
+                "hash": item["hash"],
+                "signature": signature,
+                "verification_url": item["verification_url"],
+                "created_at": now,
+                "updated_at": now,
+                "is_deleted": False,
+            }
+            for item, signature in zip(batch, signatures)
+        ])
+        record_created(db, [(now, item["document_type"], issuer_id) for item in batch])
+        db.commit()
+        issued_digests.add(item["hash"] for item in batch)
+        queue_thumbnails(item["hash"] for item in batch)
+        recent_documents.push(issuer_id, [_issued_item(item, issuer_id, issuer_name) for item in batch])
+        for item in batch:
+            audit_log.record(AuditEventType.create, item["doc_record_id"], issuer_id,
+                             {"document_type": item["document_type"], "sha256": item["hash"].hex()})
+    except Exception as e:
+        db.rollback()
+        print(f"[Bulk Upload Error] Failed to insert batch: {e}")
+        storage = get_document_storage()
+        for item in batch:
+            # deduplicated content belongs to an earlier document as well
+            if item["stored_new"]:
+                storage.delete(item["hash"])
+        return [_failed(item["index"], item["filename"], "Could not save the document record.") for item in batch]
+
+    return [
+        {
+            "event": "item",
+            "index": item["index"],
+            "filename": item["filename"],
+            "status": "issued",
+            "doc_encrypted_id": encode_doc_id(item["doc_record_id"]),
+            "verification_url": item["verification_url"],
+        }
+        for item in batch
+    ]
+
+
+@router.post("/verify-content")
+async def verify_content(request: Request):
+    """
+    Content-addressed verification: only the PDF is uploaded (form field "file"),
+    no doc_encrypted_id needed. The digest is computed while the upload streams
+    in, checked against the in-memory Bloom filter of issued digests (unknown
+    documents are rejected without touching the database) and then looked up
+    through the index on DocumentRecord.hash.
+    """
+    # only the digest is needed, nothing is spooled to disk
+    _, files = await stream_hashed_form(request, keep_files=False)
+    if not files.get("file"):
+        raise HTTPException(status_code=400, detail="No file uploaded.")
+
+    digest = files["file"][0].digest
+    doc_record_id, outcome = await run_in_threadpool(_verify_digest, digest)
+    _record_verification(digest, doc_record_id, outcome)
+    return outcome
+
+
+def _valid_outcome(document) -> dict:
+    return {
+        "status": "valid",
+        "message": "The document is authentic.",
+        "document": {
+            "doc_encrypted_id": encode_doc_id(document.doc_record_id),
+            "doc_owner_name": document.doc_owner_name,
+            "document_type": document.document_type,
+            "issuer_name": document.issuer_name,
+            "issue_date": str(document.issue_date),
+        },
+    }
+
+
+def _record_verification(digest: bytes, doc_record_id: Optional[uuid.UUID], outcome: dict):
+    audit_log.record(AuditEventType.verify, doc_record_id,
+                     detail={"sha256": digest.hex(), "status": outcome["status"]})
+
+
+def _verify_digest(digest: bytes) -> Tuple[Optional[uuid.UUID], dict]:
+    """
+    Returns:
+        Tuple[Optional[uuid.UUID], dict]: The matching document (None if the digest
+            was never issued) and the outcome.
+    """
+    cached = verification_cache.get_by_digest(digest)
+    if cached is not None:
+        return cached
+
+    if not issued_digests.might_contain(digest):
+        return None, NOT_ISSUED
+
+    # taken before the read, a delete committing in between keeps the answer out of the cache
+    generation = verification_cache.generation()
+    db = SessionLocal()
+    try:
+        document = get_document_by_hash(db, digest)
+        if document is None:
+            return None, NOT_ISSUED
+
+        if get_signing_engine().verify(digest, document.signature):
+            outcome = _valid_outcome(document)
+        else:
+            outcome = BAD_SIGNATURE
+
+        verification_cache.put(document.doc_record_id, digest, outcome, generation)
+        return document.doc_record_id, outcome
+    finally:
+        db.close()
+
+
+@router.post("/verify-batch")
+async def verify_batch(request: Request):
+    """
+    Verifies many documents in one request. The multipart body may carry up to
+    MAX_BATCH_VERIFY_ITEMS "files" parts (hashed in the threadpool while they
+    stream in, never written to disk, MAX_BATCH_VERIFY_BYTES in total) and a
+    "digests" field with hex SHA-256 digests separated by commas or whitespace.
+
+    All digests are resolved with a single query, signatures are checked in
+    the signing worker pool, and the response streams NDJSON: one "item" line
+    per input in input order, then a "done" summary.
+    """
+    # one part per file plus the digests field, both limits are enforced while the body streams in
+    fields, files = await stream_hashed_form(request, keep_files=False, max_parts=MAX_BATCH_VERIFY_ITEMS + 1,
+                                             max_total_bytes=MAX_BATCH_VERIFY_BYTES)
+
+    inputs = [(upload.filename, upload.digest) for upload in files.get("files", [])]
+    for token in fields.get("digests", "").replace(",", " ").split():
+        try:
+            digest = bytes.fromhex(token)
+        except ValueError:
+            digest = None
+        inputs.append((token, digest if digest and len(digest) == 32 else None))
+
+    if not inputs:
+        raise HTTPException(status_code=400, detail="No files or digests to verify.")
+    if len(inputs) > MAX_BATCH_VERIFY_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_VERIFY_ITEMS} items per batch.")
+
+    outcomes = await run_in_threadpool(_verify_digests, [digest for _, digest in inputs if digest])
+    for digest, (doc_record_id, outcome) in outcomes.items():
+        _record_verification(digest, doc_record_id, outcome)
+
+    def results():
+        valid = 0
+        yield _ndjson({"event": "accepted", "total": len(inputs)})
+        for index, (name, digest) in enumerate(inputs):
+            if digest is None:
+                outcome = {"status": "invalid", "message": "Not a valid SHA-256 hex digest."}
+            else:
+                outcome = outcomes[digest][1]
+            valid += outcome["status"] == "valid"
+            yield _ndjson({"event": "item", "index": index, "input": name,
+                           "sha256": digest.hex() if digest else None, **outcome})
+        yield _ndjson({"event": "done", "total": len(inputs), "valid": valid, "invalid": len(inputs) - valid})
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+def _verify_digests(digests) -> dict:
+    """
+    Batch counterpart of _verify_digest: cache, then Bloom filter, then one
+    query for everything left, then one pooled signature check.
+
+    Returns:
+        dict: (doc_record_id or None, outcome) per digest.
+    """
+    outcomes = {}
+    pending = []
+    for digest in set(digests):
+        cached = verification_cache.get_by_digest(digest)
+        if cached is not None:
+            outcomes[digest] = cached
+        elif issued_digests.might_contain(digest):
+            pending.append(digest)
+        else:
+            outcomes[digest] = (None, NOT_ISSUED)
+
+    if pending:
+        generation = verification_cache.generation()
+        db = SessionLocal()
+        try:
+            documents = get_documents_by_hashes(db, pending)
+        finally:
+            db.close()
+
+        by_digest = {bytes(document.hash): document for document in documents}
+        found = list(by_digest.items())
+        checks = get_signing_engine().verify_batch([digest for digest, _ in found],
+                                                   [bytes(document.signature) for _, document in found])
+
+        for (digest, document), is_valid in zip(found, checks):
+            outcome = _valid_outcome(document) if is_valid else BAD_SIGNATURE
+            verification_cache.put(document.doc_record_id, digest, outcome, generation)
+            outcomes[digest] = (document.doc_record_id, outcome)
+
+        for digest in pending:
+            outcomes.setdefault(digest, (None, NOT_ISSUED))
+
+    return outcomes
+
+
+@router.api_route("/view/{doc_encrypted_id}", methods=["GET", "HEAD"])
+def view_document(doc_encrypted_id: str, request: Request, db: Session = Depends(get_db)):
+    """
+    Serves a stored document to the pdf.js viewer. Range requests are answered
+    with 206 partial content so the first page renders before the whole file is
+    downloaded, and repeat views with an unchanged document get a 304.
+    """
+    try:
+        doc_record_id = decode_doc_id(doc_encrypted_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Document not found.")
+
+    digest = (
+        db.query(DocumentRecord.hash)
+        .filter(DocumentRecord.doc_record_id == doc_record_id, DocumentRecord.is_deleted.is_not(True))
+        .scalar()
+    )
+    if digest is None:
+        raise HTTPException(status_code=404, detail="Document not found.")
+    digest = bytes(digest)
+
+    storage = get_document_storage()
+    path = storage.local_path(digest)
+    if path is None and not storage.exists(digest):
+        print(f"[View Error] Stored file of document {doc_record_id} is missing: {digest.hex()}")
+        raise HTTPException(status_code=404, detail="Document file not found.")
+
+    filename = f"{encode_doc_id(doc_record_id)}.pdf"
+    if path is None:
+        # remote backend, no byte ranges but the ETag still short-circuits repeat views
+        response = serve_stream(storage.open(digest), digest, request.headers.get("if-none-match"), filename)
+    else:
+        response = serve_document(path, digest, request.headers.get("if-none-match"), filename)
+
+    # a QR scan is a verification too, counted once per view: not for 304s, HEADs or
+    # the follow-up range requests pdf.js makes after the first one
+    range_header = request.headers.get("range", "")
+    if (request.method == "GET" and response.status_code != 304
+            and (not range_header or range_header.replace(" ", "").startswith("bytes=0-"))):
+        audit_log.record(AuditEventType.verify, doc_record_id, detail={"sha256": digest.hex(), "status": "viewed"})
+    return response
+
+
+@router.get("/thumbnail/{doc_encrypted_id}")
+async def document_thumbnail(doc_encrypted_id: str, request: Request, v: Optional[str] = None):
+    """
+    First page of a document as a PNG, for the document index pages. Rendered
+    on first request unless THUMBNAIL_RENDER_MODE=eager already did it at
+    issuance. Soft-deleted documents keep their thumbnail for the trash page.
+
+    The list items carry thumbnail_version: requested with ?v=<thumbnail_version>
+    the thumbnail is cached as immutable, any other v is revalidated instead.
+
+    While a cold thumbnail renders nothing is held, neither a database
+    connection nor a threadpool thread: the route awaits the render. A render
+    taking longer than THUMBNAIL_RENDER_TIMEOUT gets a 503 with Retry-After,
+    the render itself carries on.
+    """
+    try:
+        doc_record_id = decode_doc_id(doc_encrypted_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Document not found.")
+
+    digest, rendered = await run_in_threadpool(_thumbnail_source, doc_record_id)
+    immutable = v == thumbnail_version(digest)
+    not_modified = thumbnail_not_modified(digest, THUMBNAIL_SUFFIX, request.headers.get("if-none-match"), immutable)
+    if not_modified is not None:
+        return not_modified
+
+    if not rendered:
+        render = await run_in_threadpool(request_thumbnail, digest)
+        try:
+            # shielded, the render is shared with other requests and must survive this one timing out
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(render)), THUMBNAIL_RENDER_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="Thumbnail is still being rendered.",
+                                headers={"Retry-After": str(THUMBNAIL_RETRY_AFTER)})
+        except Exception:
+            raise HTTPException(status_code=503, detail="Thumbnail is not available.",
+                                headers={"Retry-After": str(THUMBNAIL_RETRY_AFTER)})
+
+    storage = get_document_storage()
+    return await run_in_threadpool(lambda: serve_thumbnail(storage.open(digest, THUMBNAIL_SUFFIX), digest,
+                                                           THUMBNAIL_SUFFIX, immutable))
+
+
+def _thumbnail_source(doc_record_id: uuid.UUID) -> Tuple[bytes, bool]:
+    """
+    The document's digest and whether its thumbnail is already stored. Uses a
+    short-lived session, released before any rendering is waited for.
+    """
+    db = SessionLocal()
+    try:
+        digest = db.query(DocumentRecord.hash).filter(DocumentRecord.doc_record_id == doc_record_id).scalar()
+    finally:
+        db.close()
+    if digest is None:
+        raise HTTPException(status_code=404, detail="Document not found.")
+    digest = bytes(digest)
+
+    storage = get_document_storage()
+    if storage.exists(digest, THUMBNAIL_SUFFIX):
+        return digest, True
+    if not storage.exists(digest):
+        print(f"[Thumbnail Error] Stored file of document {doc_record_id} is missing: {digest.hex()}")
+        raise HTTPException(status_code=404, detail="Document file not found.")
+    return digest, False
+
+
+@router.get("/verify-stats")
+def verify_stats():
+    return {
+        "verification_cache": verification_cache.stats(),
+        "issued_digest_filter": issued_digests.stats(),
+    }
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Form
 from sqlalchemy.orm import Session
 
 from db.crud import get_multi
 from db.database import get_db
 from db.models.model_notification import Notification
 from db.models.model_notified_user import NotifiedUser
+from db.models.model_notification_subscription import NotificationSubscription, NotificationTopic
 
 router = APIRouter()
 
@@ -61,7 +62,40 @@ def get_notification(account_id: str, db: Session = Depends(get_db)):
                 "message": notification.message,
                 "created_at": notification.created_at,
                 "has_read": has_read,
+                "item_count": notification.item_count,
+                "detail": notification.detail,
+                "topic": notification.topic.value if notification.topic else None,
             }
         )
 
     return notifications
+
+
+@router.get("/notifications/{account_id}/subscriptions")
+def get_subscriptions(account_id: int, db: Session = Depends(get_db)):
+    # every topic is subscribed unless the account has opted out of it
+    preferences = {
+        each.topic: each.is_subscribed
+        for each in get_multi(db, NotificationSubscription, "account_id", account_id)
+    }
+
+    return [
+        {"topic": topic.value, "subscribed": preferences.get(topic, True)}
+        for topic in NotificationTopic
+    ]
+
+
+@router.put("/notifications/{account_id}/subscriptions")
+def update_subscription(account_id: int,
+                        topic: NotificationTopic = Form(...),
+                        subscribed: bool = Form(...),
+                        db: Session = Depends(get_db)):
+    preference = db.query(NotificationSubscription).filter_by(account_id=account_id, topic=topic).first()
+
+    if preference:
+        preference.is_subscribed = subscribed
+    else:
+        db.add(NotificationSubscription(account_id=account_id, topic=topic, is_subscribed=subscribed))
+
+    db.commit()
+    return {"topic": topic.value, "subscribed": subscribed}
@@ -1,3 +1,4 @@
+import shutil
 from typing import Optional
 from fastapi import APIRouter, Form, Depends, File, HTTPException
 from datetime import datetime
@@ -9,7 +10,10 @@ from password_processor import pw_processor
 from db.models.model_staff_system_acc import StaffSystemAcc
 from db.models.model_staff import Staff
 from db.crud import create, get_filtered_column_values, get_by_column, update
+from db.models.model_notification_subscription import NotificationTopic
+from notification.notification_service import notify_superusers
 from fastapi import UploadFile
+from document_processor.hash_processor import CHUNK_SIZE
 from pathlib import Path
 from db.data_validator.validator import (validate_email,
                                          validate_password,
@@ -48,6 +52,10 @@ def create_user(
 
     new_account = create(db, StaffSystemAcc, record_data)
 
+    notify_superusers(f"New account created for {account_holder_name} ({email}).", db,
+                      topic=NotificationTopic.account_created,
+                      item_ref=str(new_account.account_id))
+
     return {
         "account_id": new_account.account_id,
         "email": new_account.email,
@@ -122,7 +130,8 @@ def profile_pic_processing(file: UploadFile, acc_id: int) -> str:
             old_file.unlink()
 
     with open(file_path, "wb") as buffer:
-        buffer.write(file.file.read())
+        # copy in chunks, the upload is never loaded into memory as a whole
+        shutil.copyfileobj(file.file, buffer, CHUNK_SIZE)
 
     return f"/profile-pics/{filename}"
 
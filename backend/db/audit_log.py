@@ -0,0 +1,166 @@
+import atexit
+import os
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import List, Optional, Union
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from db.database import SessionLocal
+from db.models.model_document_audit_event import AuditEventType, DocumentAuditEvent
+
+AUDIT_FLUSH_BATCH_SIZE = int(os.getenv("AUDIT_FLUSH_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "2"))
+# events kept while the database is unreachable, the oldest are dropped beyond this
+AUDIT_BUFFER_MAX = int(os.getenv("AUDIT_BUFFER_MAX", "100000"))
+
+
+class AuditLog:
+    """
+    In-process buffer of audit events. record() only appends to memory, a
+    background thread writes the buffer with one multi-row INSERT per batch
+    whenever batch_size events are waiting or every interval_seconds, so no
+    request waits on an audit insert.
+
+    Events are stamped when recorded, not when written. A failed flush puts
+    the batch back and is retried on the next round. Events still buffered when
+    the process dies are lost, at most interval_seconds worth; a normal exit
+    flushes them.
+
+    Args:
+        batch_size (int): Events per INSERT, also the size that wakes the writer early.
+        interval_seconds (float): Longest time an event waits in the buffer.
+        max_buffer (int): Buffer bound, reached only if writes keep failing.
+    """
+
+    def __init__(self, batch_size: int = AUDIT_FLUSH_BATCH_SIZE,
+                 interval_seconds: float = AUDIT_FLUSH_INTERVAL_SECONDS,
+                 max_buffer: int = AUDIT_BUFFER_MAX):
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self._buffer: deque = deque(maxlen=max_buffer)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+
+    def record(self, event_type: AuditEventType, doc_record_id: Optional[Union[uuid.UUID, str]] = None,
+               actor_id: Optional[int] = None, detail: Optional[dict] = None):
+        event = {
+            "event_type": event_type,
+            "doc_record_id": uuid.UUID(str(doc_record_id)) if doc_record_id is not None else None,
+            "actor_id": actor_id,
+            "occurred_at": datetime.now(ZoneInfo("Asia/Kuala_Lumpur")),
+            "detail": detail,
+        }
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(event)
+            pending = len(self._buffer)
+        self._ensure_started()
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Writes everything buffered so far, in batches.
+
+        Returns:
+            int: Number of events written.
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take(self.batch_size)
+                if not batch:
+                    return written
+                try:
+                    _write_events(batch)
+                except Exception:
+                    self._put_back(batch)
+                    raise
+                written += len(batch)
+                self.written += len(batch)
+
+    def _take(self, count: int) -> List[dict]:
+        with self._lock:
+            return [self._buffer.popleft() for _ in range(min(count, len(self._buffer)))]
+
+    def _put_back(self, batch: List[dict]):
+        with self._lock:
+            room = self._buffer.maxlen - len(self._buffer)
+            self.dropped += max(0, len(batch) - room)
+            # keep the newest ones, in their original order, ahead of events recorded since
+            self._buffer.extendleft(reversed(batch[len(batch) - room:] if room < len(batch) else batch))
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stop.clear()
+                    self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                    self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"[Audit Log Error] {len(self._buffer)} events not written: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[Audit Log Error] Flush failed, retrying: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"buffered": len(self._buffer), "written": self.written, "dropped": self.dropped}
+
+
+def _write_events(events: List[dict]):
+    db = SessionLocal()
+    try:
+        db.execute(insert(DocumentAuditEvent), events)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def list_audit_events(db: Session, doc_record_id: Optional[uuid.UUID] = None, actor_id: Optional[int] = None,
+                      before: Optional[int] = None, limit: int = 50) -> List[DocumentAuditEvent]:
+    """
+    Newest first history of one document and/or one actor, served by the
+    (doc_record_id, event_id) and (actor_id, event_id) indexes. Pages are keyset
+    based: pass the event_id of the last row of the previous page as before.
+    """
+    query = db.query(DocumentAuditEvent)
+    if doc_record_id is not None:
+        query = query.filter(DocumentAuditEvent.doc_record_id == doc_record_id)
+    if actor_id is not None:
+        query = query.filter(DocumentAuditEvent.actor_id == actor_id)
+    if before is not None:
+        query = query.filter(DocumentAuditEvent.event_id < before)
+    return query.order_by(DocumentAuditEvent.event_id.desc()).limit(limit).all()
+
+
+audit_log = AuditLog()
+atexit.register(audit_log.stop)
@@ -1,32 +1,279 @@
-from sqlalchemy.orm import Session
+import re
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from sqlalchemy import bindparam, cast, func, text, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION, UUID
+from sqlalchemy.orm import Session, aliased, undefer
 from db.models.model_owner import Owner
+from db.models.model_staff import Staff
+from db.models.models_document_record import DocumentRecord
 from db.models.model_staff_system_acc import StaffSystemAcc
+from db.document_stats import record_deleted_state
+from db.name_cache import owner_names, resolve_many, staff_names
 
 
 def get_full_name_by_account_id(db: Session, account_id: str) -> str:
+    """
+    Staff full name of an account, read through the staff name cache.
+    """
     try:
         account_id = int(account_id)
     except ValueError:
         raise ValueError("Invalid account ID")
 
-    acc_details = (
-        db.query(StaffSystemAcc)
-        .filter(StaffSystemAcc.account_id == account_id)
-        .first()
-    )
-
-    if not acc_details or not acc_details.staff:
+    name = get_staff_full_names(db, [account_id])[account_id]
+    if name is None:
         raise ValueError("Staff account not found.")
 
-    return acc_details.staff.full_name
+    return name
+
+
+def get_staff_full_names(db: Session, account_ids: Iterable[int]) -> Dict[int, Optional[str]]:
+    """
+    Resolves many account ids to staff full names, cached ones from the cache
+    and the rest with one joined query. Unknown accounts map to None.
+    """
+    def load(missing: List[int]) -> Dict[int, str]:
+        rows = (
+            db.query(StaffSystemAcc.account_id, Staff.first_name, Staff.last_name)
+            .join(Staff, Staff.staff_id == StaffSystemAcc.staff_id)
+            .filter(StaffSystemAcc.account_id.in_(missing))
+            .all()
+        )
+        return {account_id: f"{first_name} {last_name}" for account_id, first_name, last_name in rows}
+
+    return resolve_many(staff_names, account_ids, load)
 
 
 def get_owner_full_name(db: Session, ic_no: str) -> str:
-    owner_details = db.query(Owner).filter(Owner.owner_ic_no == ic_no).first()
+    name = get_owner_full_names(db, [ic_no]).get(ic_no)
 
-    if not owner_details:
+    if name is None:
         raise ValueError("Provided IC does not exist in owner records.")
 
-    return owner_details.full_name
+    return name
+
+
+def get_owner_full_names(db: Session, ic_nos: Iterable[str]) -> Dict[str, str]:
+    """
+    Resolves many owner ICs, for bulk flows: cached ones (including known
+    unknowns) from the owner name cache, the rest in a single query.
+    ICs that do not exist in owner records are simply absent from the result.
+    """
+    def load(missing: List[str]) -> Dict[str, str]:
+        rows = (
+            db.query(Owner.owner_ic_no, Owner.first_name, Owner.last_name)
+            .filter(Owner.owner_ic_no.in_(missing))
+            .all()
+        )
+        return {ic_no: f"{first_name} {last_name}" for ic_no, first_name, last_name in rows}
+
+    return {ic_no: name for ic_no, name in resolve_many(owner_names, ic_nos, load).items() if name is not None}
+
+
+def get_document_by_hash(db: Session, digest: bytes) -> Optional[DocumentRecord]:
+    """
+    Active (not soft-deleted) document whose stored digest matches, served by
+    the index on DocumentRecord.hash.
+    """
+    return (
+        db.query(DocumentRecord)
+        .options(undefer(DocumentRecord.signature))
+        .filter(DocumentRecord.hash == digest, DocumentRecord.is_deleted.is_not(True))
+        .first()
+    )
+
+
+def get_documents_by_hashes(db: Session, digests: Iterable[bytes]) -> List:
+    """
+    Active documents matching any of the digests, resolved in a single statement
+    (Postgres plans the IN list as hash = ANY(array) on the hash index). Only the
+    columns needed to report a verification result are loaded.
+    """
+    digests = list(set(digests))
+    if not digests:
+        return []
+
+    return (
+        db.query(DocumentRecord.doc_record_id, DocumentRecord.hash, DocumentRecord.signature,
+                 DocumentRecord.doc_owner_name, DocumentRecord.document_type,
+                 DocumentRecord.issuer_name, DocumentRecord.issue_date)
+        .filter(DocumentRecord.hash.in_(digests), DocumentRecord.is_deleted.is_not(True))
+        .all()
+    )
+
+
+# what the document index pages show, the signature blob is never read here
+# (hash is 32 bytes and versions the thumbnail URLs)
+DOCUMENT_LIST_COLUMNS = (
+    DocumentRecord.doc_record_id,
+    DocumentRecord.hash,
+    DocumentRecord.doc_owner_name,
+    DocumentRecord.doc_owner_ic,
+    DocumentRecord.document_type,
+    DocumentRecord.issuer_id,
+    DocumentRecord.issuer_name,
+    DocumentRecord.issue_date,
+    DocumentRecord.verification_url,
+    DocumentRecord.is_deleted,
+    DocumentRecord.deleted_by,
+    DocumentRecord.deleted_at,
+)
+
+
+def list_documents(db: Session, is_deleted: bool, owner_ic: str = "", doc_type: str = "",
+                   issuer_id: Optional[int] = None, offset: int = 0, limit: int = 10,
+                   with_total: bool = True) -> Tuple[List, Optional[int]]:
+    """
+    One page of document records as plain rows, for the listing endpoints.
+
+    At most two statements whatever the page size: a count, and the page itself
+    with the deleter's name joined in (deleted_by_name). The issuer name is
+    already stored on the record. Filtering by issuer_id is served by the
+    (issuer_id, created_at DESC) index.
+
+    Parameters:
+        is_deleted (bool): List soft-deleted documents instead of active ones.
+        owner_ic (str): Exact owner IC filter, ignored when empty.
+        doc_type (str): Exact document type filter, ignored when empty.
+        issuer_id (Optional[int]): Only documents issued by this account.
+        offset (int): Rows to skip.
+        limit (int): Page size.
+        with_total (bool): Count all matches, skipped (None) when False.
+
+    Returns:
+        Tuple[List, Optional[int]]: The rows, newest first, and the total number of matches.
+    """
+    filters = [DocumentRecord.is_deleted.is_(True) if is_deleted else DocumentRecord.is_deleted.is_not(True)]
+    if owner_ic:
+        filters.append(DocumentRecord.doc_owner_ic == owner_ic)
+    if doc_type:
+        filters.append(DocumentRecord.document_type == doc_type)
+    if issuer_id is not None:
+        filters.append(DocumentRecord.issuer_id == issuer_id)
+
+    total = db.query(DocumentRecord.doc_record_id).filter(*filters).count() if with_total else None
+
+    deleter = aliased(StaffSystemAcc)
+    rows = (
+        db.query(*DOCUMENT_LIST_COLUMNS, deleter.account_holder_name.label("deleted_by_name"))
+        .outerjoin(deleter, deleter.account_id == DocumentRecord.deleted_by)
+        .filter(*filters)
+        .order_by(DocumentRecord.created_at.desc(), DocumentRecord.doc_record_id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    return rows, total
+
+
+def build_prefix_query(search: str) -> Optional[str]:
+    """
+    Turns free text into a to_tsquery expression where every word is a prefix
+    ("ali bin 9001" -> "ali:* & bin:* & 9001:*"). Only letters and digits are
+    kept, so the result is always valid tsquery syntax.
+    """
+    words = re.findall(r"[^\W_]+", search.lower())
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def search_documents(db: Session, search: str, doc_type: str = "", limit: int = 10,
+                     after: Optional[Tuple[float, uuid.UUID]] = None) -> List:
+    """
+    Active documents whose owner name, IC, type or issuer name contain words
+    starting with every word of search, best matches first. Served by the GIN
+    index on search_vector.
+
+    Pages are keyset based: pass the (rank, doc_record_id) of the last row of
+    the previous page as after, so deep pages cost the same as the first one.
+
+    Parameters:
+        search (str): Free text, partial words are fine.
+        doc_type (str): Exact document type filter, ignored when empty.
+        limit (int): Page size.
+        after (Optional[Tuple[float, uuid.UUID]]): Cursor of the previous page.
+
+    Returns:
+        List: Rows with the listing columns plus rank.
+    """
+    prefix_query = build_prefix_query(search)
+    if prefix_query is None:
+        return []
+
+    ts_query = func.to_tsquery("simple", prefix_query)
+    rank = cast(func.ts_rank(DocumentRecord.search_vector, ts_query), DOUBLE_PRECISION)
+
+    query = (
+        db.query(*DOCUMENT_LIST_COLUMNS, rank.label("rank"))
+        .filter(DocumentRecord.search_vector.op("@@")(ts_query), DocumentRecord.is_deleted.is_not(True))
+    )
+    if doc_type:
+        query = query.filter(DocumentRecord.document_type == doc_type)
+    if after is not None:
+        query = query.filter(tuple_(rank, DocumentRecord.doc_record_id) < tuple_(*after))
+
+    return query.order_by(rank.desc(), DocumentRecord.doc_record_id.desc()).limit(limit).all()
+
+
+# Locks the requested rows, flips the ones not yet in the target state and
+# reports every found row as changed or conflicting, all in one statement.
+SET_DELETED_STATE = text("""
+    WITH target AS (
+        SELECT doc_record_id, is_deleted IS TRUE AS was_deleted
+        FROM document_record
+        WHERE doc_record_id = ANY(:ids)
+        FOR UPDATE
+    ), changed AS (
+        UPDATE document_record AS d
+        SET is_deleted = :deleted,
+            deleted_by = CASE WHEN :deleted THEN :actor_id END,
+            deleted_at = CASE WHEN :deleted THEN :now END,
+            updated_at = :now
+        FROM target
+        WHERE d.doc_record_id = target.doc_record_id AND target.was_deleted <> :deleted
+        RETURNING d.doc_record_id, d.document_type, d.doc_owner_name, d.issuer_id, d.created_at
+    )
+    SELECT target.doc_record_id, changed.document_type, changed.doc_owner_name, changed.issuer_id,
+           changed.created_at, changed.doc_record_id IS NOT NULL AS is_changed
+    FROM target LEFT JOIN changed ON changed.doc_record_id = target.doc_record_id
+""").bindparams(bindparam("ids", type_=ARRAY(UUID(as_uuid=True))))
+
+
+def set_documents_deleted(db: Session, doc_record_ids: Iterable[uuid.UUID], deleted: bool,
+                          actor_id: int) -> Tuple[List, List[uuid.UUID], List[uuid.UUID]]:
+    """
+    Soft-deletes (deleted=True) or recovers (deleted=False) many documents with
+    a single UPDATE and moves them between the stats rollup buckets. The
+    caller commits.
+
+    Parameters:
+        doc_record_ids (Iterable[uuid.UUID]): Documents to change.
+        deleted (bool): Target state.
+        actor_id (int): Account doing the change, recorded as deleted_by on delete.
+
+    Returns:
+        Tuple[List, List[uuid.UUID], List[uuid.UUID]]: Changed rows (doc_record_id,
+            document_type, doc_owner_name, issuer_id), ids already in the target
+            state and ids that do not exist.
+    """
+    doc_record_ids = list(set(doc_record_ids))
+    if not doc_record_ids:
+        return [], [], []
 
+    rows = db.execute(SET_DELETED_STATE, {
+        "ids": doc_record_ids,
+        "deleted": deleted,
+        "actor_id": actor_id,
+        "now": datetime.now(ZoneInfo("Asia/Kuala_Lumpur")),
+    }).all()
 
+    changed = [row for row in rows if row.is_changed]
+    record_deleted_state(db, [(row.created_at, row.document_type, row.issuer_id) for row in changed], deleted)
+    conflicts = [row.doc_record_id for row in rows if not row.is_changed]
+    found = {row.doc_record_id for row in rows}
+    missing = [doc_record_id for doc_record_id in doc_record_ids if doc_record_id not in found]
+    return changed, conflicts, missing
@@ -0,0 +1,140 @@
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from db.models.model_document_stats import DocumentStatsDaily
+
+STATS_TIMEZONE = ZoneInfo("Asia/Kuala_Lumpur")
+GROUP_BY_COLUMNS = {
+    "day": DocumentStatsDaily.day,
+    "document_type": DocumentStatsDaily.document_type,
+    "issuer_id": DocumentStatsDaily.issuer_id,
+}
+
+# (day, document_type, issuer_id, is_deleted)
+StatsKey = Tuple[date, str, int, bool]
+
+RECONCILE = text("""
+    LOCK TABLE document_stats_daily IN EXCLUSIVE MODE;
+    DELETE FROM document_stats_daily;
+    INSERT INTO document_stats_daily (day, document_type, issuer_id, is_deleted, doc_count)
+    SELECT (created_at AT TIME ZONE 'Asia/Kuala_Lumpur')::date, document_type, issuer_id,
+           is_deleted IS TRUE, count(*)
+    FROM document_record
+    GROUP BY 1, 2, 3, 4;
+""")
+
+
+def stats_day(created_at: datetime) -> date:
+    return created_at.astimezone(STATS_TIMEZONE).date()
+
+
+def apply_deltas(db: Session, deltas: Dict[StatsKey, int]):
+    """
+    Adds count deltas to the rollup in one upsert. Runs in the caller's
+    transaction, so the rollup commits (or rolls back) with the document change.
+    """
+    values = [
+        {"day": day, "document_type": document_type, "issuer_id": issuer_id, "is_deleted": is_deleted,
+         "doc_count": delta}
+        for (day, document_type, issuer_id, is_deleted), delta in sorted(deltas.items()) if delta
+    ]
+    if not values:
+        return
+
+    # sorted keys, concurrent writers lock the rollup rows in the same order
+    statement = insert(DocumentStatsDaily).values(values)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["day", "document_type", "issuer_id", "is_deleted"],
+        set_={"doc_count": DocumentStatsDaily.doc_count + statement.excluded.doc_count},
+    ))
+
+
+def record_created(db: Session, documents: Iterable[Tuple[datetime, str, int]]):
+    """
+    Counts newly inserted documents, given as (created_at, document_type, issuer_id).
+    """
+    apply_deltas(db, Counter((stats_day(created_at), document_type, issuer_id, False)
+                             for created_at, document_type, issuer_id in documents))
+
+
+def record_deleted_state(db: Session, documents: Iterable[Tuple[datetime, str, int]], deleted: bool):
+    """
+    Moves documents between the active and deleted buckets after a soft delete
+    (deleted=True) or recover (deleted=False).
+    """
+    deltas: Dict[StatsKey, int] = Counter()
+    for created_at, document_type, issuer_id in documents:
+        day = stats_day(created_at)
+        deltas[(day, document_type, issuer_id, not deleted)] -= 1
+        deltas[(day, document_type, issuer_id, deleted)] += 1
+    apply_deltas(db, deltas)
+
+
+def record_edited(db: Session, created_at: datetime, issuer_id: int, is_deleted: bool,
+                  old_document_type: str, new_document_type: str):
+    """
+    Moves a document to another type bucket when its type is edited.
+    """
+    if old_document_type == new_document_type:
+        return
+    day = stats_day(created_at)
+    apply_deltas(db, {
+        (day, old_document_type, issuer_id, is_deleted): -1,
+        (day, new_document_type, issuer_id, is_deleted): 1,
+    })
+
+
+def query_stats(db: Session, group_by: List[str], date_from: Optional[date] = None, date_to: Optional[date] = None,
+                document_type: str = "", issuer_id: Optional[int] = None,
+                include_deleted: bool = False) -> List[dict]:
+    """
+    Document counts from the rollup, grouped by any of day, document_type and issuer_id.
+
+    Raises:
+        ValueError: For an unknown group_by column.
+    """
+    unknown = [column for column in group_by if column not in GROUP_BY_COLUMNS]
+    if unknown:
+        raise ValueError(f"Cannot group by: {', '.join(unknown)}")
+
+    columns = [GROUP_BY_COLUMNS[column] for column in group_by]
+    query = db.query(*columns, func.sum(DocumentStatsDaily.doc_count).label("count"))
+    if not include_deleted:
+        query = query.filter(DocumentStatsDaily.is_deleted.is_(False))
+    if date_from:
+        query = query.filter(DocumentStatsDaily.day >= date_from)
+    if date_to:
+        query = query.filter(DocumentStatsDaily.day <= date_to)
+    if document_type:
+        query = query.filter(DocumentStatsDaily.document_type == document_type)
+    if issuer_id is not None:
+        query = query.filter(DocumentStatsDaily.issuer_id == issuer_id)
+
+    rows = query.group_by(*columns).order_by(*columns).all()
+    return [{**dict(row._mapping), "count": int(row.count)} for row in rows]
+
+
+def reconcile(db: Session):
+    """
+    Rebuilds the rollup from document_record. The table lock makes concurrent
+    incremental updates wait, they then apply on top of the rebuilt counts.
+    """
+    db.execute(RECONCILE)
+    db.commit()
+
+
+if __name__ == "__main__":
+    from db.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        reconcile(session)
+        print("document_stats_daily rebuilt")
+    finally:
+        session.close()
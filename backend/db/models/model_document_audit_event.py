@@ -0,0 +1,38 @@
+from sqlalchemy import Column, BigInteger, DateTime, ForeignKey, Index, Enum as SqlEnum
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+import enum
+from ..database import Base
+
+
+class AuditEventType(str, enum.Enum):
+    create = "create"
+    edit = "edit"
+    delete = "delete"
+    recover = "recover"
+    verify = "verify"
+
+
+class DocumentAuditEvent(Base):
+    """
+    Append-only history of document events. Rows are only ever inserted (the
+    migration installs a trigger rejecting UPDATE and DELETE), and
+    doc_record_id has no foreign key so the history outlives documents purged
+    by the retention worker. Written in batches through db.audit_log.
+    """
+    __tablename__ = "document_audit_event"
+
+    event_id = Column(BigInteger, primary_key=True)
+    event_type = Column(SqlEnum(
+        AuditEventType,
+        name="audit_event_type_enum",
+        values_callable=lambda x: [e.value for e in x]
+    ), nullable=False)
+    doc_record_id = Column(UUID(as_uuid=True), nullable=True)  # None for verifications of unknown content
+    actor_id = Column(BigInteger, ForeignKey("staff_system_acc.account_id"), nullable=True)  # None for public verifications
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+    detail = Column(JSONB, nullable=True)
+
+    __table_args__ = (
+        Index("ix_document_audit_event_doc_event", "doc_record_id", "event_id"),
+        Index("ix_document_audit_event_actor_event", "actor_id", "event_id"),
+    )
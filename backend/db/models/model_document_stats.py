@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Date, BigInteger, Boolean, ForeignKey, PrimaryKeyConstraint, Index
+from ..database import Base
+
+
+class DocumentStatsDaily(Base):
+    """
+    Rollup of document_record counts by issuance day (Asia/Kuala_Lumpur),
+    document type, issuer and deleted flag. Kept current incrementally by the
+    writes that change document_record, rebuilt by document_stats.reconcile().
+    """
+    __tablename__ = "document_stats_daily"
+
+    day = Column(Date, nullable=False)
+    document_type = Column(String, nullable=False)
+    issuer_id = Column(BigInteger, ForeignKey("staff_system_acc.account_id"), nullable=False)
+    is_deleted = Column(Boolean, nullable=False)
+    doc_count = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("day", "document_type", "issuer_id", "is_deleted"),
+        Index("ix_document_stats_daily_issuer_day", "issuer_id", "day"),
+    )
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, DateTime, BigInteger, String, func
+from sqlalchemy import Column, DateTime, BigInteger, Integer, String, Text, Enum as SqlEnum, func
 from ..database import Base
+from .model_notification_subscription import NotificationTopic
 
 
 class Notification(Base):
@@ -8,3 +9,13 @@ class Notification(Base):
     notification_id = Column(BigInteger, primary_key=True, autoincrement=True)
     message = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    topic = Column(SqlEnum(
+        NotificationTopic,
+        name="notification_topic_enum",
+        values_callable=lambda x: [e.value for e in x],
+        create_type=False
+    ), nullable=True)
+
+    # coalesced notifications: number of events merged and a JSON pointer to them
+    item_count = Column(Integer, nullable=False, default=1, server_default="1")
+    detail = Column(Text, nullable=True)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, BigInteger, Boolean, ForeignKey, Enum as SqlEnum, PrimaryKeyConstraint
+import enum
+from ..database import Base
+
+
+# Define the valid notification topics
+class NotificationTopic(str, enum.Enum):
+    document_issued = "document_issued"
+    document_edited = "document_edited"
+    document_deleted = "document_deleted"
+    document_recovered = "document_recovered"
+    account_created = "account_created"
+
+
+class NotificationSubscription(Base):
+    """
+    Per-account topic preference. Accounts are subscribed to every topic by
+    default, a row is only stored once the preference is changed.
+    """
+    __tablename__ = "notification_subscription"
+
+    account_id = Column(BigInteger, ForeignKey("staff_system_acc.account_id", ondelete="CASCADE"), nullable=False)
+    topic = Column(SqlEnum(
+        NotificationTopic,
+        name="notification_topic_enum",
+        values_callable=lambda x: [e.value for e in x]
+    ), nullable=False)
+    is_subscribed = Column(Boolean, nullable=False, default=True)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("account_id", "topic"),
+    )
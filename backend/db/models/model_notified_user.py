@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, BigInteger, Boolean, func
+from sqlalchemy import Column, DateTime, ForeignKey, BigInteger, Boolean, Index, func
 from datetime import datetime
 from ..database import Base
 
@@ -13,3 +13,7 @@ class NotifiedUser(Base):
     received_at = Column(DateTime(timezone=True), nullable=True)
     has_read = Column(Boolean, default=False, nullable=True)
 
+    __table_args__ = (
+        # serves the websocket resume query (account_id = ? AND notification_id > ?)
+        Index("ix_notified_user_account_notification", "account_id", "notification_id"),
+    )
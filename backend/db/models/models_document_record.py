@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Date, DateTime, LargeBinary, ForeignKey, BigInteger, Index, Boolean, func
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Date, DateTime, LargeBinary, ForeignKey, BigInteger, Index, Boolean, Computed, func, text
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 import uuid
 from datetime import datetime
 from ..database import Base
@@ -20,8 +20,9 @@ class DocumentRecord(Base):
     issuer_name = Column(String, nullable=False)
     issue_date = Column(Date, nullable=False)
 
-    hash = Column(LargeBinary, nullable=False)
-    signature = Column(LargeBinary, nullable=False)
+    # blobs only verification needs, not loaded with the entity unless undefer()-ed
+    hash = deferred(Column(LargeBinary, nullable=False))
+    signature = deferred(Column(LargeBinary, nullable=False))
     verification_url = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=False)
@@ -31,10 +32,23 @@ class DocumentRecord(Base):
     deleted_by = Column(BigInteger, ForeignKey('staff_system_acc.account_id'), nullable=True)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
 
+    # full-text search over owner, IC, type and issuer, maintained by postgres on every write
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "to_tsvector('simple', doc_owner_name || ' ' || replace(doc_owner_ic, '-', ' ') || ' ' "
+        "|| document_type || ' ' || issuer_name)", persisted=True)))
+
     issuer = relationship("StaffSystemAcc", foreign_keys=[issuer_id])
     deleted_by_user = relationship("StaffSystemAcc", foreign_keys=[deleted_by])
 
     __table_args__ = (
         Index("ix_document_records_doc_owner", "doc_owner_name", "doc_owner_ic"),
         Index("ix_document_record_is_deleted", "is_deleted"),
+        # content-addressed verification looks documents up by digest
+        Index("ix_document_record_hash", "hash"),
+        Index("ix_document_record_created_at", "created_at"),
+        # latest documents of an issuer (home page)
+        Index("ix_document_record_issuer_created_at", "issuer_id", created_at.desc()),
+        Index("ix_document_record_search_vector", "search_vector", postgresql_using="gin"),
+        # trash only, the retention worker picks expired rows from it
+        Index("ix_document_record_trash_deleted_at", "deleted_at", postgresql_where=text("is_deleted IS TRUE")),
     )
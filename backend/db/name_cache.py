@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from db.models.model_owner import Owner
+from db.models.model_staff import Staff
+from db.models.model_staff_system_acc import StaffSystemAcc
+
+NAME_CACHE_SIZE = int(os.getenv("NAME_CACHE_SIZE", "50000"))
+NAME_CACHE_TTL_SECONDS = float(os.getenv("NAME_CACHE_TTL_SECONDS", "600"))
+# unknown keys are remembered briefly, a new owner record shows up after at most this long
+# on other workers (immediately on the worker that inserts it)
+NAME_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("NAME_CACHE_NEGATIVE_TTL_SECONDS", "30"))
+
+_MISS = object()
+
+
+class NameCache:
+    """
+    LRU + TTL cache of key -> full name, with negative entries (None) for keys
+    that do not exist, so repeated lookups of an unknown IC do not hit the
+    database either.
+
+    Args:
+        max_size (int): Maximum number of cached keys.
+        ttl_seconds (float): Lifetime of a found name.
+        negative_ttl_seconds (float): Lifetime of a "does not exist" entry.
+    """
+
+    def __init__(self, max_size: int = NAME_CACHE_SIZE, ttl_seconds: float = NAME_CACHE_TTL_SECONDS,
+                 negative_ttl_seconds: float = NAME_CACHE_NEGATIVE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable):
+        """
+        Returns:
+            The cached name, None for a known-missing key, or _MISS if not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return _MISS
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, name: Optional[str]):
+        ttl = self.ttl_seconds if name is not None else self.negative_ttl_seconds
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, name)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def resolve_many(cache: NameCache, keys: Iterable[Hashable], load) -> Dict[Hashable, Optional[str]]:
+    """
+    Read-through batch lookup: cached keys are answered from the cache, all the
+    others with a single call to load(missing_keys) -> {key: name}. Keys load
+    does not return are cached as missing.
+    """
+    result, missing = {}, []
+    for key in set(keys):
+        name = cache.get(key)
+        if name is _MISS:
+            missing.append(key)
+        else:
+            result[key] = name
+
+    if missing:
+        loaded = load(missing)
+        for key in missing:
+            name = loaded.get(key)
+            cache.put(key, name)
+            result[key] = name
+    return result
+
+
+owner_names = NameCache()  # owner IC -> owner full name
+staff_names = NameCache()  # staff_system_acc.account_id -> staff full name
+
+
+# Invalidation on every ORM write to the source rows of this process. Bulk
+# query.update()/delete() calls bypass mapper events and must invalidate themselves.
+#
+# The mapper events fire at flush, before the row is committed: a concurrent
+# request could still read the old row and cache it again. So the flush only
+# records the keys on the session, they are invalidated once the transaction
+# commits (and forgotten if it rolls back).
+_DIRTY_KEYS = "name_cache_dirty_keys"
+
+
+def _mark_dirty(target, cache: NameCache, key: Optional[Hashable]):
+    """key None invalidates the whole cache, like NameCache.invalidate()."""
+    session = object_session(target)
+    if session is None:
+        cache.invalidate(key)
+        return
+    session.info.setdefault(_DIRTY_KEYS, set()).add((cache, key))
+
+
+@event.listens_for(Owner, "after_insert")
+@event.listens_for(Owner, "after_update")
+@event.listens_for(Owner, "after_delete")
+def _invalidate_owner(mapper, connection, target):
+    _mark_dirty(target, owner_names, target.owner_ic_no)
+
+
+@event.listens_for(StaffSystemAcc, "after_insert")
+@event.listens_for(StaffSystemAcc, "after_update")
+@event.listens_for(StaffSystemAcc, "after_delete")
+def _invalidate_account(mapper, connection, target):
+    _mark_dirty(target, staff_names, target.account_id)
+
+
+@event.listens_for(Staff, "after_update")
+@event.listens_for(Staff, "after_delete")
+def _invalidate_staff(mapper, connection, target):
+    # staff rows are keyed by staff_id, not account_id, and change rarely
+    _mark_dirty(target, staff_names, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for cache, key in session.info.pop(_DIRTY_KEYS, ()):
+        cache.invalidate(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop(_DIRTY_KEYS, None)
@@ -0,0 +1,197 @@
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional, Tuple
+
+from db.database import SessionLocal
+from db.models.models_document_record import DocumentRecord
+
+BLOOM_EXPECTED_DOCUMENTS = int(os.getenv("BLOOM_EXPECTED_DOCUMENTS", "1000000"))
+BLOOM_FALSE_POSITIVE_RATE = float(os.getenv("BLOOM_FALSE_POSITIVE_RATE", "0.001"))
+# a "not issued" answer is only trusted if the filter caught up with the db this recently,
+# documents issued by another worker become visible after at most this many seconds
+BLOOM_MAX_STALENESS_SECONDS = float(os.getenv("BLOOM_MAX_STALENESS_SECONDS", "5"))
+LOAD_BATCH_SIZE = 10000
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over SHA-256 digests.
+
+    The digests are already uniformly distributed, so the k bit positions are
+    derived from the digest itself (double hashing on two 64-bit slices)
+    instead of hashing it again.
+
+    Args:
+        capacity (int): Number of items the filter is sized for.
+        false_positive_rate (float): Target false positive rate at capacity.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.capacity = max(capacity, 1)
+        self.bit_count = max(8, int(-self.capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.bit_count / self.capacity * math.log(2)))
+        self.bits = bytearray((self.bit_count + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest: bytes):
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.bit_count
+
+    def add(self, digest: bytes) -> bool:
+        """
+        Sets the bits of digest. count only grows when at least one bit was
+        still clear, so adding a digest that is already in the filter (a
+        refresh re-reading its overlap window) does not count it twice.
+
+        Returns:
+            bool: True if the digest was new to the filter.
+        """
+        new = False
+        for position in self._positions(digest):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.bits)
+
+
+class IssuedDigestIndex:
+    """
+    In-memory Bloom filter of every issued document digest, in front of the
+    DocumentRecord.hash index. A digest the filter has never seen is rejected
+    without a database round trip, a hit still goes to the database (the filter
+    can return false positives and does not know about soft deletion).
+
+    The filter is loaded from the database on first use and then caught up
+    incrementally (rows created since the last watermark) whenever a negative
+    answer would otherwise rely on a view older than BLOOM_MAX_STALENESS_SECONDS.
+    Documents issued by this process are added right away via add().
+    """
+
+    def __init__(self):
+        self._filter: Optional[BloomFilter] = None
+        self._watermark: Optional[datetime] = None
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.passed = 0
+
+    def might_contain(self, digest: bytes) -> bool:
+        """
+        Returns:
+            bool: False if the digest was certainly never issued, True if it may have been.
+        """
+        self._ensure_loaded()
+        if digest in self._filter:
+            self.passed += 1
+            return True
+
+        if self.refresh(max_staleness=BLOOM_MAX_STALENESS_SECONDS):
+            if digest in self._filter:
+                self.passed += 1
+                return True
+
+        self.rejected += 1
+        return False
+
+    def add(self, digests: Iterable[bytes]):
+        if self._filter is None:
+            # not loaded yet, the first load reads these rows from the db anyway
+            return
+        for digest in digests:
+            self._filter.add(digest)
+
+    def refresh(self, max_staleness: Optional[float] = None) -> bool:
+        """
+        Adds the digests of documents created since the last load. The filter is
+        rebuilt, sized from the current row count, once it holds more items than
+        it was sized for.
+
+        Args:
+            max_staleness (float): Skip the refresh if the filter caught up with the
+                db at most this many seconds ago. Checked under the lock, so
+                concurrent callers wait for one refresh instead of each running one.
+
+        Returns:
+            bool: True if the filter was refreshed.
+        """
+        with self._lock:
+            if max_staleness is not None and time.monotonic() - self._refreshed_at <= max_staleness:
+                return False
+            if self._filter is None or self._filter.count > self._filter.capacity:
+                self._load_all()
+                return True
+
+            # small overlap, rows committed slightly out of created_at order are not missed
+            since = self._watermark - timedelta(seconds=60) if self._watermark else None
+            self._load(self._filter, since)
+            self._refreshed_at = time.monotonic()
+            return True
+
+    def stats(self) -> dict:
+        bloom = self._filter
+        return {
+            "loaded": bloom is not None,
+            "items": bloom.count if bloom else 0,
+            "capacity": bloom.capacity if bloom else 0,
+            "size_bytes": bloom.size_bytes if bloom else 0,
+            "hash_count": bloom.hash_count if bloom else 0,
+            "rejected_without_db": self.rejected,
+            "passed_to_db": self.passed,
+        }
+
+    def _ensure_loaded(self):
+        if self._filter is None:
+            with self._lock:
+                if self._filter is None:
+                    self._load_all()
+
+    def _load_all(self):
+        capacity = max(BLOOM_EXPECTED_DOCUMENTS, self._count_documents() * 2)
+        bloom = BloomFilter(capacity, BLOOM_FALSE_POSITIVE_RATE)
+        self._watermark = None
+        self._load(bloom, None)
+        self._filter = bloom
+        self._refreshed_at = time.monotonic()
+
+    def _load(self, bloom: BloomFilter, since: Optional[datetime]):
+        for digest, created_at in self._fetch_rows(since):
+            bloom.add(bytes(digest))
+            if created_at is not None and (self._watermark is None or created_at > self._watermark):
+                self._watermark = created_at
+
+    @staticmethod
+    def _count_documents() -> int:
+        db = SessionLocal()
+        try:
+            return db.query(DocumentRecord.doc_record_id).count()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _fetch_rows(since: Optional[datetime]) -> Iterator[Tuple[bytes, datetime]]:
+        db = SessionLocal()
+        try:
+            query = db.query(DocumentRecord.hash, DocumentRecord.created_at)
+            if since is not None:
+                query = query.filter(DocumentRecord.created_at >= since)
+            yield from query.execution_options(yield_per=LOAD_BATCH_SIZE)
+        finally:
+            db.close()
+
+
+issued_digests = IssuedDigestIndex()
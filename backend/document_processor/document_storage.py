@@ -0,0 +1,187 @@
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional, Type
+
+from .hash_processor import CHUNK_SIZE
+
+DOCUMENT_STORAGE_BACKEND = os.getenv("DOCUMENT_STORAGE_BACKEND", "local")
+DOCUMENT_STORAGE_ROOT = Path(os.getenv("DOCUMENT_STORAGE_ROOT", "uploads/documents"))
+PDF_SUFFIX = ".pdf"
+
+
+class DocumentStorage(ABC):
+    """
+    Content-addressed store for stamped PDFs. Objects are keyed by their SHA-256
+    digest (DocumentRecord.hash), so identical content is stored once and a key
+    never changes meaning.
+
+    Files derived from a document (e.g. its thumbnail) are stored next to it
+    under the same digest with another suffix.
+
+    Implementations must make put_file atomic: a reader either sees the
+    complete object or none at all.
+    """
+
+    @abstractmethod
+    def put_file(self, src: Path, digest: bytes, suffix: str = PDF_SUFFIX) -> bool:
+        """
+        Moves src into the store under digest and suffix. src is consumed either way.
+
+        Returns:
+            bool: True if the object was new, False if identical content was already stored.
+        """
+
+    @abstractmethod
+    def open(self, digest: bytes, suffix: str = PDF_SUFFIX) -> BinaryIO:
+        """
+        Raises:
+            FileNotFoundError: If no object is stored under digest.
+        """
+
+    @abstractmethod
+    def exists(self, digest: bytes, suffix: str = PDF_SUFFIX) -> bool:
+        pass
+
+    @abstractmethod
+    def delete(self, digest: bytes):
+        """
+        Removes the document and every file derived from it, a missing object
+        is not an error. Callers make sure no remaining DocumentRecord has this digest.
+        """
+
+    def local_path(self, digest: bytes, suffix: str = PDF_SUFFIX) -> Optional[Path]:
+        """
+        Path of the object on the local filesystem, for backends that have one.
+        Lets /view hand the file to FileResponse (byte ranges) instead of streaming it.
+        """
+        return None
+
+
+class LocalShardedStorage(DocumentStorage):
+    """
+    Stores objects on the local filesystem under a two level fan-out,
+    root/ab/cd/abcd....pdf. With 65536 leaf directories a million documents
+    means about 15 files per directory instead of one huge flat one.
+
+    Writes go to a temp file in the target directory and are published with
+    os.replace, which is atomic within one filesystem.
+    """
+
+    def __init__(self, root: Path = DOCUMENT_STORAGE_ROOT):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, digest: bytes, suffix: str = PDF_SUFFIX) -> Path:
+        name = digest.hex()
+        return self.root / name[:2] / name[2:4] / f"{name}{suffix}"
+
+    def put_file(self, src: Path, digest: bytes, suffix: str = PDF_SUFFIX) -> bool:
+        dest = self._path(digest, suffix)
+        if dest.exists():
+            Path(src).unlink(missing_ok=True)
+            return False
+
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=dest.parent, suffix=".part")
+        try:
+            try:
+                os.close(fd)
+                # a rename when src is on the same filesystem, a copy otherwise
+                os.replace(src, tmp)
+            except OSError:
+                with open(src, "rb") as f_in, open(tmp, "wb") as f_out:
+                    shutil.copyfileobj(f_in, f_out, CHUNK_SIZE)
+                Path(src).unlink(missing_ok=True)
+            os.replace(tmp, dest)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return True
+
+    def open(self, digest: bytes, suffix: str = PDF_SUFFIX) -> BinaryIO:
+        return open(self._path(digest, suffix), "rb")
+
+    def exists(self, digest: bytes, suffix: str = PDF_SUFFIX) -> bool:
+        return self._path(digest, suffix).is_file()
+
+    def delete(self, digest: bytes):
+        path = self._path(digest)
+        # the PDF and its derived files, in-flight temp files are named differently
+        for variant in path.parent.glob(f"{digest.hex()}.*"):
+            variant.unlink(missing_ok=True)
+
+    def local_path(self, digest: bytes, suffix: str = PDF_SUFFIX) -> Optional[Path]:
+        path = self._path(digest, suffix)
+        return path if path.is_file() else None
+
+
+# other backends (e.g. an S3-compatible store) register themselves here
+STORAGE_BACKENDS: Dict[str, Type[DocumentStorage]] = {"local": LocalShardedStorage}
+
+_storage: Optional[DocumentStorage] = None
+_storage_lock = threading.Lock()
+
+
+def register_storage_backend(name: str, backend: Type[DocumentStorage]):
+    STORAGE_BACKENDS[name] = backend
+
+
+def get_document_storage() -> DocumentStorage:
+    """
+    Process-wide store selected by DOCUMENT_STORAGE_BACKEND.
+    """
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            try:
+                _storage = STORAGE_BACKENDS[DOCUMENT_STORAGE_BACKEND]()
+            except KeyError:
+                raise ValueError(f"Unknown document storage backend: {DOCUMENT_STORAGE_BACKEND}")
+        return _storage
+
+
+def migrate_flat_files(root: Path = DOCUMENT_STORAGE_ROOT) -> int:
+    """
+    Moves documents stored flat as root/<doc_record_id>.pdf into the store,
+    keyed by their DocumentRecord.hash. Files without a record are left alone.
+
+    Returns:
+        int: Number of files moved.
+    """
+    import uuid
+
+    from db.database import SessionLocal
+    from db.models.models_document_record import DocumentRecord
+
+    storage = get_document_storage()
+    moved = 0
+    db = SessionLocal()
+    try:
+        for path in Path(root).glob("*.pdf"):
+            try:
+                doc_record_id = uuid.UUID(path.stem)
+            except ValueError:
+                continue
+            digest = db.query(DocumentRecord.hash).filter(DocumentRecord.doc_record_id == doc_record_id).scalar()
+            if digest is None:
+                continue
+            storage.put_file(path, bytes(digest))
+            moved += 1
+    finally:
+        db.close()
+    return moved
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Document storage maintenance")
+    parser.add_argument("--migrate", action="store_true", help="move flat <doc_record_id>.pdf files into the store")
+    args = parser.parse_args()
+
+    if args.migrate:
+        print(f"{migrate_flat_files()} documents moved into {DOCUMENT_STORAGE_ROOT}")
@@ -0,0 +1,124 @@
+import os
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+# documents are immutable once stamped, the browser may keep them but must revalidate,
+# an edit or delete then takes effect on the next view (answered by a 304 otherwise)
+VIEW_CACHE_CONTROL = "private, no-cache"
+# thumbnail URLs carrying the current ?v= are content-addressed, a new digest is a new URL
+THUMBNAIL_IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# larger reads mean fewer event loop round trips per range of a big PDF
+VIEW_CHUNK_SIZE = 256 * 1024
+
+
+class DocumentFileResponse(FileResponse):
+    chunk_size = VIEW_CHUNK_SIZE
+
+
+def strong_etag(digest: bytes) -> str:
+    """
+    Strong ETag of a stored document, its content digest (DocumentRecord.hash).
+    """
+    return f'"{digest.hex()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match evaluation (RFC 9110 13.1.2), weak comparison as required for GET.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def serve_document(path: Path, digest: bytes, if_none_match: Optional[str], filename: str) -> Response:
+    """
+    Response for a stored PDF with byte-range support (Accept-Ranges, 206,
+    If-Range) and a strong ETag. A matching If-None-Match is answered with a
+    304 before the file is even opened.
+
+    Args:
+        path (Path): Stored PDF.
+        digest (bytes): Content digest of the PDF, used as the ETag.
+        if_none_match (Optional[str]): The request's If-None-Match header.
+        filename (str): File name offered to the browser.
+
+    Returns:
+        Response: 304, or a FileResponse that answers Range requests itself.
+    """
+    etag = strong_etag(digest)
+    headers = {"etag": etag, "cache-control": VIEW_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    return DocumentFileResponse(
+        path,
+        media_type="application/pdf",
+        headers=headers,
+        filename=filename,
+        # stat once here, not again in a thread per request
+        stat_result=os.stat(path),
+        content_disposition_type="inline",
+    )
+
+
+def serve_stream(stream: BinaryIO, digest: bytes, if_none_match: Optional[str], filename: str) -> Response:
+    """
+    serve_document for storage backends without a local file: same ETag and
+    304 handling, the body is streamed in full.
+    """
+    etag = strong_etag(digest)
+    headers = {"etag": etag, "cache-control": VIEW_CACHE_CONTROL,
+               "content-disposition": f'inline; filename="{filename}"'}
+    if etag_matches(if_none_match, etag):
+        stream.close()
+        return Response(status_code=304, headers=headers)
+
+    def chunks():
+        with stream:
+            while chunk := stream.read(VIEW_CHUNK_SIZE):
+                yield chunk
+
+    return StreamingResponse(chunks(), media_type="application/pdf", headers=headers)
+
+
+def thumbnail_etag(digest: bytes, variant: str) -> str:
+    """
+    ETag of a stored thumbnail: the document digest plus the thumbnail variant
+    (its size), so a re-rendered size never matches an old copy.
+    """
+    return f'"{digest.hex()}{variant}"'
+
+
+def thumbnail_not_modified(digest: bytes, variant: str, if_none_match: Optional[str],
+                           immutable: bool) -> Optional[Response]:
+    """
+    304 for a client that already holds the current thumbnail, checked before
+    the thumbnail is rendered or opened. None otherwise.
+    """
+    etag = thumbnail_etag(digest, variant)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"etag": etag, "cache-control": _thumbnail_cache_control(immutable)})
+    return None
+
+
+def serve_thumbnail(stream: BinaryIO, digest: bytes, variant: str, immutable: bool) -> Response:
+    """
+    Response for a stored thumbnail. Requested with the list item's
+    thumbnail_version (immutable=True) the URL is content-addressed and the
+    browser keeps it for a year without asking again. Without it the URL is
+    keyed by document only and, like the PDF itself, revalidated on every use.
+    """
+    headers = {"etag": thumbnail_etag(digest, variant), "cache-control": _thumbnail_cache_control(immutable)}
+    with stream:
+        # a few dozen KB, one read
+        return Response(stream.read(), media_type="image/png", headers=headers)
+
+
+def _thumbnail_cache_control(immutable: bool) -> str:
+    return THUMBNAIL_IMMUTABLE_CACHE_CONTROL if immutable else VIEW_CACHE_CONTROL
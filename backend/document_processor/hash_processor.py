@@ -0,0 +1,312 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+HASH_ALGORITHM = "sha256"
+CHUNK_SIZE = 64 * 1024
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_SIZE_MB", "256")) * 1024 * 1024
+MAX_FIELD_BYTES = 64 * 1024  # plain form fields (IC, doc type, dates...)
+# body bytes handed to the parser (and so the hasher) per threadpool call
+PARSE_BATCH_BYTES = 256 * 1024
+
+UPLOAD_TMP_DIR = Path("uploads/tmp")
+UPLOAD_TMP_DIR.mkdir(parents=True, exist_ok=True)
+
+
+class HashedUpload:
+    """
+    An uploaded file that has been hashed while it was received.
+
+    The bytes are spooled to a temp file under UPLOAD_TMP_DIR, never held in
+    memory as a whole. Callers move the file to its final place (or call
+    cleanup()) once they are done with it.
+
+    Attributes:
+        filename (str): Client supplied file name.
+        content_type (str): Client supplied content type.
+        digest (bytes): Raw digest, the value stored in DocumentRecord.hash.
+        size (int): Number of bytes received.
+        path (Optional[Path]): Temp file holding the bytes, None if only the digest was kept.
+    """
+    __slots__ = ("filename", "content_type", "digest", "size", "path")
+
+    def __init__(self, filename: str, content_type: str, digest: bytes, size: int, path: Optional[Path]):
+        self.filename = filename
+        self.content_type = content_type
+        self.digest = digest
+        self.size = size
+        self.path = path
+
+    @property
+    def hexdigest(self) -> str:
+        return self.digest.hex()
+
+    def open(self) -> BinaryIO:
+        return open(self.path, "rb")
+
+    def cleanup(self):
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+
+
+def new_hasher():
+    return hashlib.new(HASH_ALGORITHM)
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"File exceeds the {max_size // (1024 * 1024)} MB limit.")
+
+
+def hash_stream(stream: BinaryIO, sink: Optional[BinaryIO] = None,
+                max_size: int = MAX_UPLOAD_BYTES, chunk_size: int = CHUNK_SIZE) -> Tuple[bytes, int]:
+    """
+    Hashes a file-like object chunk by chunk, optionally copying it to sink.
+    At most chunk_size bytes are held in memory at any time.
+
+    Raises:
+        HTTPException: 413 if the stream is longer than max_size.
+
+    Returns:
+        Tuple[bytes, int]: The digest and the number of bytes read.
+    """
+    hasher = new_hasher()
+    size = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_size:
+            raise _too_large(max_size)
+        hasher.update(chunk)
+        if sink is not None:
+            sink.write(chunk)
+    return hasher.digest(), size
+
+
+def hash_file(path: Path, chunk_size: int = CHUNK_SIZE) -> bytes:
+    """
+    Digest of a file on disk, e.g. a stamped PDF before it is stored.
+    """
+    with open(path, "rb") as f:
+        digest, _ = hash_stream(f, max_size=os.path.getsize(path), chunk_size=chunk_size)
+    return digest
+
+
+def hash_upload_file(file: UploadFile, max_size: int = MAX_UPLOAD_BYTES) -> HashedUpload:
+    """
+    Hashes an UploadFile that FastAPI has already parsed (File(...) parameter),
+    copying it to a temp file in the same pass instead of file.file.read().
+
+    Args:
+        file (UploadFile): The uploaded file.
+        max_size (int): Maximum accepted size in bytes.
+
+    Returns:
+        HashedUpload: Digest, size and temp path of the upload.
+    """
+    tmp = tempfile.NamedTemporaryFile(dir=UPLOAD_TMP_DIR, suffix=Path(file.filename or "").suffix, delete=False)
+    try:
+        with tmp:
+            digest, size = hash_stream(file.file, sink=tmp, max_size=max_size)
+    except BaseException:
+        Path(tmp.name).unlink(missing_ok=True)
+        raise
+
+    return HashedUpload(file.filename, file.content_type, digest, size, Path(tmp.name))
+
+
+class _StreamingFormParser:
+    """
+    multipart/form-data parser that hashes file parts while the request body is
+    still arriving. File bytes go straight to the hasher and a temp file,
+    plain fields are kept in memory up to MAX_FIELD_BYTES each. With
+    keep_files=False file bytes are only hashed, nothing is written to disk.
+
+    max_parts and max_total_bytes bound the whole body, they fail the request
+    as soon as they are exceeded instead of after the body was consumed.
+    """
+
+    def __init__(self, boundary: bytes, max_size: int, keep_files: bool = True,
+                 max_parts: Optional[int] = None, max_total_bytes: Optional[int] = None):
+        self.max_size = max_size
+        self.keep_files = keep_files
+        self.max_parts = max_parts
+        self.max_total_bytes = max_total_bytes
+        self.parts = 0
+        self.total_bytes = 0
+        self.fields: Dict[str, str] = {}
+        self.files: Dict[str, List[HashedUpload]] = {}
+        self._error: Optional[HTTPException] = None
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+        self._name = ""
+        self._filename: Optional[str] = None
+        self._field_data = bytearray()
+        self._hasher = None
+        self._size = 0
+        self._tmp = None
+        self.parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+
+    def write(self, data: bytes):
+        self.total_bytes += len(data)
+        if self.max_total_bytes is not None and self.total_bytes > self.max_total_bytes:
+            self._error = HTTPException(status_code=413,
+                                        detail=f"Request exceeds the {self.max_total_bytes // (1024 * 1024)} MB limit.")
+            return
+        self.parser.write(data)
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._field_data = bytearray()
+        self.parts += 1
+        if self.max_parts is not None and self.parts > self.max_parts and not self._error:
+            self._error = HTTPException(status_code=400, detail=f"At most {self.max_parts} parts per request.")
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._name = options.get(b"name", b"").decode("utf-8")
+        filename = options.get(b"filename")
+        self._filename = filename.decode("utf-8") if filename is not None else None
+        if self._filename is not None:
+            self._hasher = new_hasher()
+            self._size = 0
+            if self.keep_files:
+                self._tmp = tempfile.NamedTemporaryFile(dir=UPLOAD_TMP_DIR, suffix=Path(self._filename).suffix,
+                                                        delete=False)
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._error:
+            return
+        chunk = data[start:end]
+        if self._filename is None:
+            if len(self._field_data) + len(chunk) > MAX_FIELD_BYTES:
+                self._error = HTTPException(status_code=413, detail=f"Form field '{self._name}' is too large.")
+                return
+            self._field_data += chunk
+            return
+
+        self._size += len(chunk)
+        if self._size > self.max_size:
+            self._error = _too_large(self.max_size)
+            return
+        self._hasher.update(chunk)
+        if self._tmp is not None:
+            self._tmp.write(chunk)
+
+    def _on_part_end(self):
+        if self._filename is None:
+            self.fields[self._name] = self._field_data.decode("utf-8")
+            return
+
+        path = None
+        if self._tmp is not None:
+            self._tmp.close()
+            path = Path(self._tmp.name)
+            self._tmp = None
+
+        self.files.setdefault(self._name, []).append(HashedUpload(
+            self._filename,
+            self._headers.get(b"content-type", b"application/octet-stream").decode("latin-1"),
+            self._hasher.digest(),
+            self._size,
+            path,
+        ))
+
+    def discard(self):
+        if self._tmp is not None:
+            self._tmp.close()
+            Path(self._tmp.name).unlink(missing_ok=True)
+        for uploads in self.files.values():
+            for upload in uploads:
+                upload.cleanup()
+
+
+async def stream_hashed_form(request: Request,
+                             max_size: int = MAX_UPLOAD_BYTES,
+                             keep_files: bool = True,
+                             max_parts: Optional[int] = None,
+                             max_total_bytes: Optional[int] = None) -> Tuple[Dict[str, str], Dict[str, List[HashedUpload]]]:
+    """
+    Parses a multipart/form-data request body as it streams in, hashing every
+    file part incrementally. Peak memory per request is PARSE_BATCH_BYTES plus
+    the plain form fields, regardless of the file size. Parsing and hashing run
+    in the threadpool, the event loop only receives the body.
+
+    Used instead of Form(...)/File(...) parameters by endpoints that only need
+    the digest of the upload (/upload, /verify), so the body is read once.
+
+    Args:
+        request (Request): The incoming request.
+        max_size (int): Maximum accepted size of each file, in bytes.
+        keep_files (bool): Spool file bytes to temp files. False when only the digests are needed.
+        max_parts (Optional[int]): Maximum number of parts (files and fields), unbounded if None.
+        max_total_bytes (Optional[int]): Maximum body size, unbounded if None.
+
+    Raises:
+        HTTPException: 400 for a non multipart body or too many parts, 413 when a file,
+            field or the whole body is too large.
+
+    Returns:
+        Tuple[Dict[str, str], Dict[str, List[HashedUpload]]]: Plain fields and hashed files by field
+            name, a field may carry several files.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data body.")
+
+    if max_total_bytes is not None:
+        try:
+            declared = int(request.headers.get("content-length", "0"))
+        except ValueError:
+            declared = 0
+        if declared > max_total_bytes:
+            raise HTTPException(status_code=413,
+                                detail=f"Request exceeds the {max_total_bytes // (1024 * 1024)} MB limit.")
+
+    form = _StreamingFormParser(params[b"boundary"], max_size, keep_files, max_parts, max_total_bytes)
+    try:
+        pending = bytearray()
+        async for chunk in request.stream():
+            pending += chunk
+            if len(pending) >= PARSE_BATCH_BYTES:
+                await run_in_threadpool(form.write, bytes(pending))
+                pending.clear()
+                if form._error:
+                    raise form._error
+        if pending:
+            await run_in_threadpool(form.write, bytes(pending))
+        if form._error:
+            raise form._error
+        form.parser.finalize()
+    except BaseException:
+        form.discard()
+        raise
+
+    return form.fields, form.files
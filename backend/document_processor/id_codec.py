@@ -0,0 +1,93 @@
+import base64
+import binascii
+import os
+import threading
+import uuid
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESSIV
+
+DOC_ID_DECODE_CACHE_SIZE = int(os.getenv("DOC_ID_DECODE_CACHE_SIZE", "4096"))
+# AES-SIV tag + one encrypted UUID block, base64url without padding
+TOKEN_LENGTH = 43
+
+
+class DocIdCodec:
+    """
+    Encodes DocumentRecord.doc_record_id as the opaque doc_encrypted_id the
+    frontend uses in /edit, /delete, /view and /verify URLs.
+
+    AES-SIV is deterministic authenticated encryption: the same id always gives
+    the same 43 character token, and a modified or forged token fails to
+    decode instead of resolving to some other document. The cipher object is
+    built once per process and reused for every row.
+
+    Args:
+        key (bytes): 32, 48 or 64 byte AES-SIV key.
+        decode_cache_size (int): Number of recently decoded tokens to remember.
+    """
+
+    def __init__(self, key: bytes, decode_cache_size: int = DOC_ID_DECODE_CACHE_SIZE):
+        self._siv = AESSIV(key)
+        self.decode = lru_cache(maxsize=decode_cache_size)(self._decode)
+
+    def encode(self, doc_record_id: uuid.UUID) -> str:
+        return base64.urlsafe_b64encode(self._siv.encrypt(doc_record_id.bytes, None)).rstrip(b"=").decode("ascii")
+
+    def encode_many(self, doc_record_ids: Iterable[uuid.UUID]) -> List[str]:
+        """
+        Tokens for a whole list page in one pass, same order as the ids.
+        """
+        encrypt = self._siv.encrypt
+        b64 = base64.urlsafe_b64encode
+        return [b64(encrypt(doc_record_id.bytes, None))[:TOKEN_LENGTH].decode("ascii")
+                for doc_record_id in doc_record_ids]
+
+    def _decode(self, token: str) -> uuid.UUID:
+        """
+        Raises:
+            ValueError: If the token is malformed or was not issued with this key.
+        """
+        if len(token) != TOKEN_LENGTH:
+            raise ValueError("Invalid document id.")
+        try:
+            return uuid.UUID(bytes=self._siv.decrypt(base64.urlsafe_b64decode(token + "="), None))
+        except (binascii.Error, InvalidTag):
+            raise ValueError("Invalid document id.")
+
+
+_codec: Optional[DocIdCodec] = None
+_codec_lock = threading.Lock()
+
+
+def get_id_codec() -> DocIdCodec:
+    """
+    Process-wide codec keyed by DOC_ID_KEY (hex encoded), which must be the
+    same on every worker and stay stable, tokens end up in bookmarked links.
+    """
+    global _codec
+    with _codec_lock:
+        if _codec is None:
+            key = os.getenv("DOC_ID_KEY")
+            if not key:
+                raise ValueError("DOC_ID_KEY environment variable is not set")
+            _codec = DocIdCodec(bytes.fromhex(key))
+        return _codec
+
+
+def encode_doc_id(doc_record_id: uuid.UUID) -> str:
+    return get_id_codec().encode(doc_record_id)
+
+
+def decode_doc_id(token: str) -> uuid.UUID:
+    """
+    Raises:
+        ValueError: If token is not a doc_encrypted_id issued with DOC_ID_KEY.
+    """
+    return get_id_codec().decode(token)
+
+
+if __name__ == "__main__":
+    print(f"DOC_ID_KEY={os.urandom(32).hex()}")
@@ -0,0 +1,140 @@
+import csv
+import io
+import itertools
+import json
+import os
+import shutil
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, UploadFile
+
+from .hash_processor import CHUNK_SIZE, MAX_UPLOAD_BYTES, UPLOAD_TMP_DIR, hash_file
+from .id_codec import encode_doc_id
+from .qr_stamper import stamp_qr
+
+VERIFICATION_BASE_URL = os.getenv("VERIFICATION_BASE_URL", "http://127.0.0.1:8050").rstrip("/")
+STAMPING_WORKERS = int(os.getenv("DOCUMENT_STAMPING_WORKERS", "0")) or os.cpu_count() or 1
+MAX_BULK_ITEMS = int(os.getenv("MAX_BULK_ITEMS", "2000"))
+# a manifest row is ~100 bytes, this leaves ample room for MAX_BULK_ITEMS rows
+MAX_MANIFEST_BYTES = int(os.getenv("MAX_MANIFEST_SIZE_KB", "2048")) * 1024
+
+MANIFEST_FIELDS = ("filename", "doc_owner_ic", "doc_type", "issue_date")
+
+_stamping_pool: Optional[ProcessPoolExecutor] = None
+_stamping_pool_lock = threading.Lock()
+
+
+def build_verification_url(doc_record_id: uuid.UUID) -> str:
+    return f"{VERIFICATION_BASE_URL}/view/{encode_doc_id(doc_record_id)}"
+
+
+def get_stamping_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for the CPU bound part of issuance (QR stamping + hashing).
+    """
+    global _stamping_pool
+    with _stamping_pool_lock:
+        if _stamping_pool is None:
+            _stamping_pool = ProcessPoolExecutor(max_workers=STAMPING_WORKERS)
+        return _stamping_pool
+
+
+def stamp_and_hash(src_path: str, out_path: str, verification_url: str) -> bytes:
+    """
+    Runs in a stamping worker: stamps the QR code and returns the digest of the
+    stamped file, which is what DocumentRecord.hash and the signature cover.
+    The caller then moves out_path into the document storage under that digest.
+    """
+    stamp_qr(Path(src_path), Path(out_path), verification_url)
+    return hash_file(Path(out_path))
+
+
+def parse_manifest(manifest: UploadFile) -> List[Dict[str, str]]:
+    """
+    Reads a bulk issuance manifest, CSV (with a header row) or a JSON list of objects,
+    with the columns filename, doc_owner_ic, doc_type and issue_date (YYYY-MM-DD).
+
+    Only the shape of the manifest is checked here, row values are validated per
+    item so one bad row does not reject the whole batch.
+
+    Raises:
+        HTTPException: 400 if the manifest cannot be read or misses columns.
+    """
+    manifest.file.seek(0, os.SEEK_END)
+    if manifest.file.tell() > MAX_MANIFEST_BYTES:
+        raise HTTPException(status_code=413, detail="Manifest is too large.")
+    manifest.file.seek(0)
+
+    # read straight off the spooled upload, the CSV reader stops one row past the cap
+    text = io.TextIOWrapper(manifest.file, encoding="utf-8-sig", newline="")
+    try:
+        if Path(manifest.filename or "").suffix.lower() == ".json":
+            rows = json.load(text)
+            if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                raise ValueError("JSON manifest must be a list of objects.")
+        else:
+            rows = list(itertools.islice(csv.DictReader(text), MAX_BULK_ITEMS + 1))
+    except (UnicodeDecodeError, ValueError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid manifest: {e}")
+    finally:
+        # leave the upload open, UploadFile closes it
+        text.detach()
+
+    if not rows:
+        raise HTTPException(status_code=400, detail="Manifest has no rows.")
+    if len(rows) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Manifest has more than {MAX_BULK_ITEMS} rows.")
+
+    missing = [field for field in MANIFEST_FIELDS if field not in rows[0]]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Manifest is missing columns: {', '.join(missing)}")
+
+    return [{field: str(row.get(field) or "").strip() for field in MANIFEST_FIELDS} for row in rows]
+
+
+def extract_member(archive: zipfile.ZipFile, filename: str, dest_dir: Path) -> Path:
+    """
+    Copies one PDF out of the bulk ZIP into dest_dir, in chunks and with the
+    upload size cap applied to the uncompressed size.
+
+    Raises:
+        ValueError: If the entry is missing, is not a PDF or is too large.
+    """
+    name = PurePosixPath(filename)
+    if name.is_absolute() or ".." in name.parts or name.suffix.lower() != ".pdf":
+        raise ValueError("Entry must be a relative path to a .pdf file.")
+
+    try:
+        info = archive.getinfo(filename)
+    except KeyError:
+        raise ValueError("File not found in archive.")
+    if info.file_size > MAX_UPLOAD_BYTES:
+        raise ValueError("File is too large.")
+
+    dest = Path(dest_dir) / f"{uuid.uuid4().hex}.pdf"
+    written = 0
+    with archive.open(info) as src, open(dest, "wb") as out:
+        # the header size can lie, count what is actually inflated
+        while chunk := src.read(CHUNK_SIZE):
+            written += len(chunk)
+            if written > MAX_UPLOAD_BYTES:
+                out.close()
+                dest.unlink(missing_ok=True)
+                raise ValueError("File is too large.")
+            out.write(chunk)
+    return dest
+
+
+def new_work_dir() -> Path:
+    work_dir = UPLOAD_TMP_DIR / f"bulk-{uuid.uuid4().hex}"
+    work_dir.mkdir(parents=True)
+    return work_dir
+
+
+def remove_work_dir(work_dir: Path):
+    shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,94 @@
+import io
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+
+import fitz  # PyMuPDF
+import qrcode
+
+QR_SIZE_PT = 72        # printed QR size, 1 inch
+QR_MARGIN_PT = 18      # distance from the bottom-right corner of the first page
+CAPTION_HEIGHT_PT = 10
+CAPTION_TEXT = "Scan to verify"
+QR_CACHE_SIZE = int(os.getenv("QR_CACHE_SIZE", "1024"))
+
+
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def render_qr_png(url: str) -> bytes:
+    """
+    Renders the verification URL as a PNG QR code.
+    Cached per process, a document that is re-stamped (e.g. after an edit)
+    reuses the image instead of encoding it again.
+    """
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=4, border=2)
+    qr.add_data(url)
+    qr.make(fit=True)
+    buffer = io.BytesIO()
+    qr.make_image(fill_color="black", back_color="white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=1)
+def _stamp_overlay() -> fitz.Document:
+    """
+    The static part of the stamp (caption under the QR), built and parsed once
+    per process and placed on every document with show_pdf_page.
+    """
+    overlay = fitz.open()
+    page = overlay.new_page(width=QR_SIZE_PT, height=CAPTION_HEIGHT_PT)
+    width = fitz.get_text_length(CAPTION_TEXT, fontname="helv", fontsize=7)
+    page.insert_text(((QR_SIZE_PT - width) / 2, CAPTION_HEIGHT_PT - 2), CAPTION_TEXT, fontsize=7, fontname="helv")
+    # round-trip through bytes so the overlay is a finished, parsed PDF
+    return fitz.open("pdf", overlay.tobytes())
+
+
+def _place_stamp(page: fitz.Page, verification_url: str):
+    rect = page.rect
+    qr_rect = fitz.Rect(rect.x1 - QR_MARGIN_PT - QR_SIZE_PT,
+                        rect.y1 - QR_MARGIN_PT - QR_SIZE_PT - CAPTION_HEIGHT_PT,
+                        rect.x1 - QR_MARGIN_PT,
+                        rect.y1 - QR_MARGIN_PT - CAPTION_HEIGHT_PT)
+    caption_rect = fitz.Rect(qr_rect.x0, qr_rect.y1, qr_rect.x1, qr_rect.y1 + CAPTION_HEIGHT_PT)
+    page.insert_image(qr_rect, stream=render_qr_png(verification_url))
+    page.show_pdf_page(caption_rect, _stamp_overlay(), 0)
+
+
+def stamp_qr(src_path: Path, out_path: Path, verification_url: str):
+    """
+    Writes a copy of the PDF at src_path to out_path with a QR code pointing to
+    verification_url in the bottom-right corner of the first page.
+
+    The original bytes are copied as-is and the stamp is appended with an
+    incremental save, only the touched objects (first page, image, overlay) are
+    written, so the cost does not grow with the page count. Encrypted or damaged
+    files that cannot be saved incrementally fall back to a full save.
+
+    Args:
+        src_path (Path): The PDF as uploaded.
+        out_path (Path): Where to write the stamped PDF.
+        verification_url (str): URL encoded in the QR code.
+
+    Raises:
+        ValueError: If the file is not a PDF or has no pages.
+    """
+    out_path = Path(out_path)
+    full_save_path = out_path.with_name(out_path.name + ".full")
+    shutil.copyfile(src_path, out_path)
+    try:
+        with fitz.open(out_path) as doc:
+            if not doc.is_pdf or doc.page_count == 0:
+                raise ValueError("File is not a PDF document or has no pages.")
+
+            _place_stamp(doc[0], verification_url)
+
+            if doc.can_save_incrementally():
+                doc.saveIncr()
+                return
+
+            doc.save(full_save_path, garbage=1, deflate=True)
+        os.replace(full_save_path, out_path)
+    except BaseException:
+        out_path.unlink(missing_ok=True)
+        full_save_path.unlink(missing_ok=True)
+        raise
@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Iterable, List, Optional, Tuple
+
+RECENT_DOCS_LIMIT = int(os.getenv("RECENT_DOCS_LIMIT", "10"))
+RECENT_DOCS_MAX_ISSUERS = int(os.getenv("RECENT_DOCS_MAX_ISSUERS", "1000"))
+# other workers' writes only show up after this, same trade-off as the verification cache
+RECENT_DOCS_TTL_SECONDS = float(os.getenv("RECENT_DOCS_TTL_SECONDS", "60"))
+
+
+class RecentDocumentsCache:
+    """
+    Latest documents per issuer for the home page (/get-processed-docs), kept
+    as a small ring buffer per issuer so the common visit needs no query.
+
+    A miss fills the buffer from the (issuer_id, created_at DESC) index with
+    twice the documents shown, the spare half absorbs deletions. Documents
+    issued by this process are pushed to the front, edited ones updated and
+    deleted ones taken out in place. Only when deletions eat into the shown
+    window, or a recovered document may belong back in it, is the buffer
+    dropped and refilled on the next read.
+
+    Args:
+        limit (int): Documents shown per issuer.
+        max_issuers (int): Issuers kept, least recently read ones are dropped first.
+        ttl_seconds (float): Age after which a buffer is refilled from the database.
+    """
+
+    def __init__(self, limit: int = RECENT_DOCS_LIMIT, max_issuers: int = RECENT_DOCS_MAX_ISSUERS,
+                 ttl_seconds: float = RECENT_DOCS_TTL_SECONDS):
+        self.limit = limit
+        self.max_issuers = max_issuers
+        self.ttl_seconds = ttl_seconds
+        self.capacity = limit * 2
+        # issuer_id -> (expires at, newest first documents, whether those are all the issuer has)
+        self._buffers: "OrderedDict[int, Tuple[float, Deque[dict], bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, issuer_id: int, load: Callable[[int, int], List[dict]]) -> List[dict]:
+        """
+        Args:
+            issuer_id (int): Issuer account.
+            load (Callable[[int, int], List[dict]]): Loads an issuer's latest n documents, newest first.
+
+        Returns:
+            List[dict]: The documents, newest first.
+        """
+        with self._lock:
+            entry = self._buffers.get(issuer_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._buffers.move_to_end(issuer_id)
+                self.hits += 1
+                return list(entry[1])[:self.limit]
+            self.misses += 1
+
+        items = load(issuer_id, self.capacity)
+        with self._lock:
+            self._buffers[issuer_id] = (time.monotonic() + self.ttl_seconds, deque(items, maxlen=self.capacity),
+                                        len(items) < self.capacity)
+            self._buffers.move_to_end(issuer_id)
+            while len(self._buffers) > self.max_issuers:
+                self._buffers.popitem(last=False)
+        return items[:self.limit]
+
+    def push(self, issuer_id: int, items: List[dict]):
+        """
+        New documents of an issuer, in creation order.
+        """
+        with self._lock:
+            entry = self._buffers.get(issuer_id)
+            if entry is not None:
+                expires_at, buffer, complete = entry
+                before = len(buffer)
+                buffer.extendleft(items)
+                # the deque dropped its oldest entries, the issuer has more than it holds now
+                if complete and before + len(items) > self.capacity:
+                    self._buffers[issuer_id] = (expires_at, buffer, False)
+
+    def update(self, issuer_id: int, doc_encrypted_id: str, changes: dict):
+        with self._lock:
+            entry = self._buffers.get(issuer_id)
+            if entry is not None:
+                for item in entry[1]:
+                    if item["doc_encrypted_id"] == doc_encrypted_id:
+                        item.update(changes)
+
+    def remove(self, issuer_id: int, doc_encrypted_ids: Iterable[str]):
+        """
+        Takes deleted documents out of an issuer's buffer. Once fewer than
+        `limit` are left of an issuer that has more, the buffer is dropped.
+        """
+        doc_encrypted_ids = set(doc_encrypted_ids)
+        with self._lock:
+            entry = self._buffers.get(issuer_id)
+            if entry is None:
+                return
+            expires_at, buffer, complete = entry
+            kept = deque((item for item in buffer if item["doc_encrypted_id"] not in doc_encrypted_ids),
+                         maxlen=self.capacity)
+            if len(kept) < self.limit and not complete:
+                del self._buffers[issuer_id]
+            else:
+                self._buffers[issuer_id] = (expires_at, kept, complete)
+
+    def invalidate(self, issuer_id: Optional[int] = None):
+        with self._lock:
+            if issuer_id is None:
+                self._buffers.clear()
+            else:
+                self._buffers.pop(issuer_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "issuers": len(self._buffers),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+recent_documents = RecentDocumentsCache()
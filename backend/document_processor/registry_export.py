@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+import os
+import zlib
+from typing import Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from db.database import SessionLocal
+from db.models.model_owner import Owner
+from db.models.model_staff import Staff
+from db.models.model_staff_system_acc import StaffSystemAcc
+from db.models.models_document_record import DocumentRecord
+from .id_codec import get_id_codec
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+EXPORT_FORMATS = ("csv", "ndjson")
+
+EXPORT_FIELDS = (
+    "doc_encrypted_id", "doc_owner_ic", "doc_owner_name", "owner_email", "document_type", "issue_date",
+    "issuer_id", "issuer_name", "issuer_staff_name", "verification_url", "sha256", "created_at", "updated_at",
+    "is_deleted", "deleted_by", "deleted_by_name", "deleted_at",
+)
+
+
+def _export_statement(include_deleted: bool):
+    issuer = aliased(StaffSystemAcc)
+    issuer_staff = aliased(Staff)
+    deleter = aliased(StaffSystemAcc)
+    statement = (
+        select(
+            DocumentRecord.doc_record_id,
+            DocumentRecord.doc_owner_ic,
+            DocumentRecord.doc_owner_name,
+            Owner.email.label("owner_email"),
+            DocumentRecord.document_type,
+            DocumentRecord.issue_date,
+            DocumentRecord.issuer_id,
+            DocumentRecord.issuer_name,
+            (issuer_staff.first_name + " " + issuer_staff.last_name).label("issuer_staff_name"),
+            DocumentRecord.verification_url,
+            DocumentRecord.hash,
+            DocumentRecord.created_at,
+            DocumentRecord.updated_at,
+            DocumentRecord.is_deleted,
+            DocumentRecord.deleted_by,
+            deleter.account_holder_name.label("deleted_by_name"),
+            DocumentRecord.deleted_at,
+        )
+        .join(Owner, Owner.owner_ic_no == DocumentRecord.doc_owner_ic)
+        .join(issuer, issuer.account_id == DocumentRecord.issuer_id)
+        .join(issuer_staff, issuer_staff.staff_id == issuer.staff_id)
+        .outerjoin(deleter, deleter.account_id == DocumentRecord.deleted_by)
+        .order_by(DocumentRecord.created_at, DocumentRecord.doc_record_id)
+    )
+    if not include_deleted:
+        statement = statement.where(DocumentRecord.is_deleted.is_not(True))
+    return statement
+
+
+def _to_records(rows) -> list:
+    # the plain doc_record_id stays internal, exports carry doc_encrypted_id like every API response
+    encrypted_ids = get_id_codec().encode_many(row.doc_record_id for row in rows)
+    records = []
+    for row, encrypted_id in zip(rows, encrypted_ids):
+        record = dict(row._mapping)
+        del record["doc_record_id"]
+        record["doc_encrypted_id"] = encrypted_id
+        record["sha256"] = bytes(record.pop("hash")).hex()
+        records.append(record)
+    return records
+
+
+def _serialize(rows, fmt: str, header: bool) -> str:
+    if fmt == "ndjson":
+        return "".join(json.dumps(record, default=str) + "\n" for record in _to_records(rows))
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    if header:
+        writer.writeheader()
+    writer.writerows(_to_records(rows))
+    return buffer.getvalue()
+
+
+def iter_export(fmt: str = "csv", compress: bool = False, include_deleted: bool = False,
+                batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    The document registry (documents joined with owner and issuer names) as a
+    stream of CSV or NDJSON chunks, one chunk per batch_size rows.
+
+    Rows come through a server-side cursor (stream_results + yield_per), so
+    neither the process nor the driver ever holds more than one batch and
+    memory stays flat for any table size. With compress=True the stream is
+    gzip, compressed incrementally as well.
+
+    Args:
+        fmt (str): "csv" or "ndjson".
+        compress (bool): gzip the output.
+        include_deleted (bool): Include soft-deleted documents.
+        batch_size (int): Rows fetched and serialized at a time.
+
+    Raises:
+        ValueError: For an unknown format.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    # wbits=31 writes a gzip header and trailer
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    db = SessionLocal()
+    try:
+        result = db.execute(_export_statement(include_deleted)
+                            .execution_options(stream_results=True, yield_per=batch_size))
+        header = True
+        for rows in result.partitions():
+            chunk = _serialize(rows, fmt, header).encode("utf-8")
+            header = False
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+        if fmt == "csv" and header:
+            chunk = _serialize([], fmt, True).encode("utf-8")
+            yield compressor.compress(chunk) if compressor is not None else chunk
+        if compressor is not None:
+            yield compressor.flush()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Export the document registry")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--gzip", action="store_true", help="gzip the output")
+    parser.add_argument("--include-deleted", action="store_true")
+    parser.add_argument("--output", "-o", help="output file, stdout if omitted")
+    args = parser.parse_args()
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for part in iter_export(args.format, args.gzip, args.include_deleted):
+            out.write(part)
+    finally:
+        if args.output:
+            out.close()
@@ -0,0 +1,154 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import text
+
+from db.database import SessionLocal
+from .document_storage import get_document_storage
+
+DOCUMENT_RETENTION_DAYS = int(os.getenv("DOCUMENT_RETENTION_DAYS", "30"))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "500"))
+RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+
+# One statement per batch: lock a bounded set of expired trash rows (rows locked
+# by another worker are skipped, not waited for), delete them, log them into
+# deleted_document from the DELETE's RETURNING, take them out of the stats
+# rollup and hand back their digests.
+MOVE_EXPIRED_BATCH = text("""
+    WITH expired AS (
+        SELECT doc_record_id
+        FROM document_record
+        WHERE is_deleted IS TRUE AND deleted_by IS NOT NULL AND deleted_at < :cutoff
+        ORDER BY deleted_at
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    ), moved AS (
+        DELETE FROM document_record AS d
+        USING expired
+        WHERE d.doc_record_id = expired.doc_record_id
+        RETURNING d.doc_owner_ic, d.document_type, d.issue_date, d.deleted_by, d.deleted_at, d.hash,
+                  d.issuer_id, d.created_at
+    ), logged AS (
+        INSERT INTO deleted_document (doc_owner_ic, document_type, issue_date, deleted_by, deleted_at)
+        SELECT doc_owner_ic, document_type, issue_date, deleted_by, deleted_at FROM moved
+    ), counted AS (
+        INSERT INTO document_stats_daily (day, document_type, issuer_id, is_deleted, doc_count)
+        SELECT (created_at AT TIME ZONE 'Asia/Kuala_Lumpur')::date, document_type, issuer_id, TRUE, -count(*)
+        FROM moved
+        GROUP BY 1, 2, 3
+        ON CONFLICT (day, document_type, issuer_id, is_deleted)
+        DO UPDATE SET doc_count = document_stats_daily.doc_count + EXCLUDED.doc_count
+    )
+    SELECT hash FROM moved
+""")
+
+STILL_REFERENCED = text("SELECT DISTINCT hash FROM document_record WHERE hash = ANY(:digests)")
+
+
+def move_expired_batch(cutoff: datetime, batch_size: int = RETENTION_BATCH_SIZE) -> int:
+    """
+    Moves one batch of soft-deleted documents whose deleted_at is older than
+    cutoff into deleted_document, in one transaction, then removes their stored
+    files unless another record still points to the same content.
+
+    Returns:
+        int: Number of documents moved, 0 once nothing is left to move.
+    """
+    db = SessionLocal()
+    try:
+        digests: List[bytes] = [bytes(row.hash) for row in
+                                db.execute(MOVE_EXPIRED_BATCH, {"cutoff": cutoff, "batch_size": batch_size})]
+        db.commit()
+
+        if digests:
+            # the store is content-addressed, identical content may back a live document too
+            kept = {bytes(row.hash) for row in db.execute(STILL_REFERENCED, {"digests": digests})}
+            storage = get_document_storage()
+            for digest in set(digests) - kept:
+                try:
+                    storage.delete(digest)
+                except OSError as e:
+                    print(f"[Retention Error] Could not remove stored file {digest.hex()}: {e}")
+        return len(digests)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def purge_expired_documents(retention_days: int = DOCUMENT_RETENTION_DAYS,
+                            batch_size: int = RETENTION_BATCH_SIZE,
+                            stop: Optional[threading.Event] = None) -> int:
+    """
+    Runs batches until no expired document is left (or stop is set). Every
+    batch commits on its own, so locks are held briefly and an interrupted run
+    simply continues next time.
+
+    Returns:
+        int: Total number of documents moved.
+    """
+    cutoff = datetime.now(ZoneInfo("Asia/Kuala_Lumpur")) - timedelta(days=retention_days)
+    total = 0
+    while not (stop and stop.is_set()):
+        moved = move_expired_batch(cutoff, batch_size)
+        total += moved
+        if moved < batch_size:
+            break
+    return total
+
+
+class RetentionWorker:
+    """
+    Background thread that runs purge_expired_documents every interval_seconds.
+    Several processes may run one, SKIP LOCKED keeps them on disjoint rows.
+
+    Args:
+        interval_seconds (float): Pause between runs.
+        retention_days (int): Days a document stays in trash before it is moved.
+    """
+
+    def __init__(self, interval_seconds: float = RETENTION_INTERVAL_SECONDS,
+                 retention_days: int = DOCUMENT_RETENTION_DAYS):
+        self.interval_seconds = interval_seconds
+        self.retention_days = retention_days
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="retention-worker", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                moved = purge_expired_documents(self.retention_days, stop=self._stop)
+                if moved:
+                    print(f"[Retention] Moved {moved} expired documents to deleted_document")
+            except Exception as e:
+                print(f"[Retention Error] {e}")
+            self._stop.wait(self.interval_seconds)
+
+
+retention_worker = RetentionWorker()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Move expired soft-deleted documents to deleted_document")
+    parser.add_argument("--days", type=int, default=DOCUMENT_RETENTION_DAYS, help="retention period in days")
+    parser.add_argument("--batch-size", type=int, default=RETENTION_BATCH_SIZE)
+    args = parser.parse_args()
+
+    print(f"{purge_expired_documents(args.days, args.batch_size)} documents moved")
@@ -0,0 +1,238 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding, rsa
+
+SIGNING_KEY_PATH = os.getenv("DOCUMENT_SIGNING_KEY_PATH", "keys/document_signing_key.pem")
+SIGNING_KEY_PASSWORD = os.getenv("DOCUMENT_SIGNING_KEY_PASSWORD")
+SIGNING_WORKERS = int(os.getenv("DOCUMENT_SIGNING_WORKERS", "0")) or os.cpu_count() or 1
+# below this many signatures a batch is verified in-process, the IPC would cost more than it saves
+POOL_VERIFY_THRESHOLD = 256
+
+# private key of the current pool worker, loaded once by _init_worker
+_worker_key = None
+
+
+def load_private_key(path: str, password: Optional[str] = None):
+    with open(path, "rb") as f:
+        return serialization.load_pem_private_key(f.read(), password.encode() if password else None)
+
+
+def _sign_with(key, digest: bytes) -> bytes:
+    """
+    Signs a document digest (DocumentRecord.hash) with an Ed25519, RSA (PSS) or EC key.
+    """
+    if isinstance(key, ed25519.Ed25519PrivateKey):
+        return key.sign(digest)
+    if isinstance(key, rsa.RSAPrivateKey):
+        return key.sign(digest,
+                        padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
+                        hashes.SHA256())
+    if isinstance(key, ec.EllipticCurvePrivateKey):
+        return key.sign(digest, ec.ECDSA(hashes.SHA256()))
+    raise ValueError(f"Unsupported signing key type: {type(key).__name__}")
+
+
+def _verify_with(public_key, digest: bytes, signature: bytes) -> bool:
+    try:
+        if isinstance(public_key, ed25519.Ed25519PublicKey):
+            public_key.verify(signature, digest)
+        elif isinstance(public_key, rsa.RSAPublicKey):
+            public_key.verify(signature, digest,
+                              padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
+                              hashes.SHA256())
+        elif isinstance(public_key, ec.EllipticCurvePublicKey):
+            public_key.verify(signature, digest, ec.ECDSA(hashes.SHA256()))
+        else:
+            raise ValueError(f"Unsupported signing key type: {type(public_key).__name__}")
+    except InvalidSignature:
+        return False
+    return True
+
+
+def _init_worker(key_path: str, password: Optional[str]):
+    global _worker_key
+    _worker_key = load_private_key(key_path, password)
+
+
+def _verify_chunk(pairs: Sequence[Tuple[bytes, bytes]]) -> List[bool]:
+    public_key = _worker_key.public_key()
+    return [_verify_with(public_key, digest, signature) for digest, signature in pairs]
+
+
+def _sign_chunk(digests: Sequence[bytes]) -> Tuple[List[bytes], float]:
+    started = time.perf_counter()
+    signatures = [_sign_with(_worker_key, digest) for digest in digests]
+    return signatures, time.perf_counter() - started
+
+
+class SigningEngine:
+    """
+    Signs document digests from a pool of worker processes.
+
+    Each worker loads the private key once, in its initializer, and keeps it for
+    its lifetime. Batches are split into one chunk per worker so the IPC cost is
+    paid per chunk, not per document, and issuance throughput scales with cores
+    instead of being capped by the GIL of the request thread.
+
+    Single verifications only need the public key and run in-process, large
+    verification batches are spread over the pool like signing.
+
+    Args:
+        key_path (str): PEM private key (Ed25519, RSA or EC).
+        password (Optional[str]): Password of the PEM file, if encrypted.
+        workers (int): Number of worker processes.
+    """
+
+    def __init__(self, key_path: str = SIGNING_KEY_PATH, password: Optional[str] = SIGNING_KEY_PASSWORD,
+                 workers: int = SIGNING_WORKERS):
+        self.key_path = key_path
+        self.workers = workers
+        # loading here fails fast on a missing or unreadable key and gives the public key
+        self.public_key = load_private_key(key_path, password).public_key()
+        self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         initargs=(key_path, password))
+        self._lock = threading.Lock()
+        self._signed = 0
+        self._batches = 0
+        self._sign_seconds = 0.0
+        self._wall_seconds = 0.0
+
+    def sign(self, digest: bytes) -> bytes:
+        return self.sign_batch([digest])[0]
+
+    def sign_batch(self, digests: Sequence[bytes]) -> List[bytes]:
+        """
+        Signs many digests, spread over the worker processes.
+
+        Args:
+            digests (Sequence[bytes]): Document digests.
+
+        Returns:
+            List[bytes]: Signatures, in the same order as digests.
+        """
+        if not digests:
+            return []
+
+        started = time.perf_counter()
+        chunk_size = -(-len(digests) // self.workers)
+        chunks = [digests[i:i + chunk_size] for i in range(0, len(digests), chunk_size)]
+
+        signatures: List[bytes] = []
+        sign_seconds = 0.0
+        for chunk_signatures, elapsed in self._pool.map(_sign_chunk, chunks):
+            signatures.extend(chunk_signatures)
+            sign_seconds += elapsed
+
+        with self._lock:
+            self._signed += len(digests)
+            self._batches += 1
+            self._sign_seconds += sign_seconds
+            self._wall_seconds += time.perf_counter() - started
+        return signatures
+
+    async def sign_batch_async(self, digests: Sequence[bytes]) -> List[bytes]:
+        """
+        sign_batch for async endpoints, waits without blocking the event loop.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.sign_batch, list(digests))
+
+    def verify(self, digest: bytes, signature: bytes) -> bool:
+        return _verify_with(self.public_key, digest, signature)
+
+    def verify_batch(self, digests: Sequence[bytes], signatures: Sequence[bytes]) -> List[bool]:
+        """
+        Checks many (digest, signature) pairs, in the worker pool for large batches.
+
+        Returns:
+            List[bool]: One result per pair, in order.
+        """
+        pairs = list(zip(digests, signatures))
+        if len(pairs) < POOL_VERIFY_THRESHOLD:
+            return [self.verify(digest, signature) for digest, signature in pairs]
+
+        chunk_size = -(-len(pairs) // self.workers)
+        chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+        results: List[bool] = []
+        for chunk_results in self._pool.map(_verify_chunk, chunks):
+            results.extend(chunk_results)
+        return results
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: signed count, batches, mean per-signature latency inside the
+                workers and overall throughput (signatures per wall-clock second).
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "signed": self._signed,
+                "batches": self._batches,
+                "mean_sign_latency_ms": round(self._sign_seconds / self._signed * 1000, 3) if self._signed else 0.0,
+                "throughput_per_s": round(self._signed / self._wall_seconds, 1) if self._wall_seconds else 0.0,
+            }
+
+    def shutdown(self):
+        self._pool.shutdown()
+
+
+_engine: Optional[SigningEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_signing_engine() -> SigningEngine:
+    """
+    Process-wide SigningEngine, the pool is started on first use.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = SigningEngine()
+        return _engine
+
+
+def generate_signing_key(path: str = SIGNING_KEY_PATH):
+    """
+    Writes a new Ed25519 private key in PEM format, for development setups.
+    The file is created owner-only (0600).
+
+    Raises:
+        FileExistsError: If a key already exists at path, it is never overwritten.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    key = ed25519.Ed25519PrivateKey.generate()
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM,
+                                  serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Document signing engine")
+    parser.add_argument("--generate-key", metavar="PATH", help="write a new Ed25519 key to PATH")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="sign N random digests and print stats")
+    args = parser.parse_args()
+
+    if args.generate_key:
+        try:
+            generate_signing_key(args.generate_key)
+        except FileExistsError:
+            parser.error(f"{args.generate_key} already exists, refusing to overwrite a signing key")
+        print(f"Signing key written to {args.generate_key}")
+    if args.benchmark:
+        engine = get_signing_engine()
+        sample = [os.urandom(32) for _ in range(args.benchmark)]
+        engine.sign_batch(sample[:engine.workers])  # warm up the workers
+        engine.sign_batch(sample)
+        print(engine.stats())
+        engine.shutdown()
@@ -0,0 +1,145 @@
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import fitz  # PyMuPDF
+
+from .document_storage import get_document_storage
+from .hash_processor import CHUNK_SIZE, UPLOAD_TMP_DIR
+
+# "lazy": rendered on the first request for a thumbnail, "eager": queued right after issuance
+# (documents issued before eager mode was enabled are still rendered lazily)
+THUMBNAIL_RENDER_MODE = os.getenv("THUMBNAIL_RENDER_MODE", "lazy")
+THUMBNAIL_WIDTH = int(os.getenv("THUMBNAIL_WIDTH", "240"))
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", "2"))
+# stored next to the PDF under the same digest, the width is part of the name so a
+# different THUMBNAIL_WIDTH renders fresh thumbnails instead of serving stale ones
+THUMBNAIL_SUFFIX = f".thumb{THUMBNAIL_WIDTH}.png"
+
+_thumbnail_pool: Optional[ProcessPoolExecutor] = None
+_eager_queue: Optional[ThreadPoolExecutor] = None
+_pending: Dict[bytes, Future] = {}
+_lock = threading.Lock()
+
+
+def get_thumbnail_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for rasterizing, kept apart from the stamping pool so a burst
+    of thumbnail requests never delays issuance.
+    """
+    global _thumbnail_pool
+    with _lock:
+        if _thumbnail_pool is None:
+            _thumbnail_pool = ProcessPoolExecutor(max_workers=THUMBNAIL_WORKERS)
+        return _thumbnail_pool
+
+
+def thumbnail_version(digest: bytes) -> str:
+    """
+    The ?v= of a document's thumbnail URL in list items: derived from the
+    content digest and the width, so it changes whenever the image would.
+    """
+    return f"{digest[:8].hex()}-{THUMBNAIL_WIDTH}"
+
+
+def render_thumbnail(src_path: str, out_path: str, width: int = THUMBNAIL_WIDTH):
+    """
+    Runs in a thumbnail worker: renders the first page of the PDF at src_path
+    as a PNG width pixels wide, QR stamp included.
+
+    Raises:
+        ValueError: If the file is not a PDF or has no pages.
+    """
+    with fitz.open(src_path) as doc:
+        if not doc.is_pdf or doc.page_count == 0:
+            raise ValueError("File is not a PDF document or has no pages.")
+        page = doc[0]
+        zoom = width / page.rect.width
+        page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False).save(out_path, output="png")
+
+
+def request_thumbnail(digest: bytes) -> Future:
+    """
+    Makes sure the thumbnail of the stored document digest exists. Concurrent
+    requests for the same digest share one render.
+
+    Returns:
+        Future: Resolves once the thumbnail is in the document storage (True),
+            or with the render error.
+    """
+    storage = get_document_storage()
+    with _lock:
+        future = _pending.get(digest)
+        if future is not None:
+            return future
+        future = _pending[digest] = Future()
+
+    try:
+        if storage.exists(digest, THUMBNAIL_SUFFIX):
+            _finish(digest, future, result=True)
+            return future
+
+        work_dir = Path(tempfile.mkdtemp(dir=UPLOAD_TMP_DIR, prefix="thumb-"))
+        src = storage.local_path(digest)
+        if src is None:
+            # remote backend, the worker needs a file to open
+            src = work_dir / "src.pdf"
+            with storage.open(digest) as f_in, open(src, "wb") as f_out:
+                shutil.copyfileobj(f_in, f_out, CHUNK_SIZE)
+        out = work_dir / "thumb.png"
+        render = get_thumbnail_pool().submit(render_thumbnail, str(src), str(out))
+    except Exception as e:
+        _finish(digest, future, error=e)
+        return future
+
+    def store(render: Future):
+        try:
+            render.result()
+            storage.put_file(out, digest, THUMBNAIL_SUFFIX)
+            _finish(digest, future, result=True)
+        except Exception as e:
+            print(f"[Thumbnail Error] Could not render {digest.hex()}: {e}")
+            _finish(digest, future, error=e)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    render.add_done_callback(store)
+    return future
+
+
+def _finish(digest: bytes, future: Future, result=None, error: Optional[BaseException] = None):
+    with _lock:
+        _pending.pop(digest, None)
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def queue_thumbnails(digests: Iterable[bytes]):
+    """
+    Eager mode hook for issuance: hands the digests to a background thread and
+    returns at once, the storage checks and (on a remote backend) the PDF
+    copies of request_thumbnail never run on the issuing request.
+    A no-op in lazy mode.
+    """
+    if THUMBNAIL_RENDER_MODE != "eager":
+        return
+    global _eager_queue
+    with _lock:
+        if _eager_queue is None:
+            _eager_queue = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnail-queue")
+        queue = _eager_queue
+    queue.submit(_request_all, set(digests))
+
+
+def _request_all(digests: Iterable[bytes]):
+    for digest in digests:
+        # errors only reach the future, a failed eager render is retried lazily on first request
+        request_thumbnail(digest)
@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+VERIFICATION_CACHE_SIZE = int(os.getenv("VERIFICATION_CACHE_SIZE", "10000"))
+VERIFICATION_CACHE_TTL_SECONDS = float(os.getenv("VERIFICATION_CACHE_TTL_SECONDS", "300"))
+
+CacheKey = Tuple[uuid.UUID, bytes]
+
+
+class VerificationCache:
+    """
+    LRU + TTL cache of verification outcomes keyed by (doc_record_id, sha256 digest).
+
+    Popular documents get verified over and over with the exact same bytes,
+    a hit skips the DocumentRecord load and the signature check. Entries of a
+    document are dropped with invalidate_document() when it is edited,
+    soft-deleted or recovered. Other workers only see that change once their
+    entry expires, so the TTL bounds how stale an answer can be.
+
+    A lookup that raced with an invalidation must not cache its answer: take
+    generation() before reading the database and pass it to put(), which
+    skips the entry if the document was invalidated in between.
+
+    Args:
+        max_size (int): Maximum number of cached outcomes.
+        ttl_seconds (float): Lifetime of an outcome.
+    """
+
+    def __init__(self, max_size: int = VERIFICATION_CACHE_SIZE, ttl_seconds: float = VERIFICATION_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[float, dict]]" = OrderedDict()
+        # secondary indexes: content-addressed lookups and per-document invalidation
+        self._by_digest: Dict[bytes, uuid.UUID] = {}
+        self._by_document: Dict[uuid.UUID, Set[bytes]] = {}
+        # doc_record_id -> generation of its last invalidation, the oldest are pruned past max_size
+        self._generation = 0
+        self._invalidated: "OrderedDict[uuid.UUID, int]" = OrderedDict()
+        self._pruned_generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, doc_record_id: uuid.UUID, digest: bytes) -> Optional[dict]:
+        key = (doc_record_id, digest)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get_by_digest(self, digest: bytes) -> Optional[Tuple[uuid.UUID, dict]]:
+        """
+        Outcome for an upload whose document is not known up front (/verify-content).
+
+        Returns:
+            Optional[Tuple[uuid.UUID, dict]]: The document the digest belongs to and the outcome.
+        """
+        with self._lock:
+            doc_record_id = self._by_digest.get(digest)
+        if doc_record_id is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        outcome = self.get(doc_record_id, digest)
+        return (doc_record_id, outcome) if outcome is not None else None
+
+    def generation(self) -> int:
+        """
+        Snapshot to take before the database read whose outcome is later put().
+        """
+        with self._lock:
+            return self._generation
+
+    def put(self, doc_record_id: uuid.UUID, digest: bytes, outcome: dict, generation: Optional[int] = None):
+        """
+        Caches an outcome. With generation (from generation(), taken before the
+        read), nothing is cached if the document was invalidated since.
+        """
+        key = (doc_record_id, digest)
+        with self._lock:
+            if generation is not None and (
+                    self._invalidated.get(doc_record_id, 0) > generation or self._pruned_generation > generation):
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, outcome)
+            self._entries.move_to_end(key)
+            self._by_digest[digest] = doc_record_id
+            self._by_document.setdefault(doc_record_id, set()).add(digest)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def invalidate_document(self, doc_record_id: uuid.UUID):
+        """
+        Drops every cached outcome of a document. Call after it is edited,
+        soft-deleted or recovered.
+        """
+        with self._lock:
+            for digest in self._by_document.get(doc_record_id, set()).copy():
+                self._drop((doc_record_id, digest))
+            self.invalidations += 1
+            self._generation += 1
+            self._invalidated[doc_record_id] = self._generation
+            self._invalidated.move_to_end(doc_record_id)
+            while len(self._invalidated) > self.max_size:
+                # forgetting one makes put() refuse every read older than it, which is safe
+                _, pruned = self._invalidated.popitem(last=False)
+                self._pruned_generation = max(self._pruned_generation, pruned)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_digest.clear()
+            self._by_document.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _drop(self, key: CacheKey):
+        doc_record_id, digest = key
+        self._entries.pop(key, None)
+        if self._by_digest.get(digest) == doc_record_id:
+            del self._by_digest[digest]
+        digests = self._by_document.get(doc_record_id)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._by_document[doc_record_id]
+
+
+verification_cache = VerificationCache()
@@ -0,0 +1,323 @@
+"""
+Load generator for the notification WebSocket subsystem.
+
+Starts one uvicorn worker serving notification/websocket_routes.py against a
+throw-away SQLite database (or the Postgres in DATABASE_URL), seeds superuser
+accounts, opens many client sockets, fires notify_superusers bursts and reports:
+    - connect rate and failed connects
+    - end-to-end delivery latency percentiles (notify_superusers -> client frame)
+    - dropped messages (expected frames that never arrived)
+    - server RSS and ConnectionManager registry size
+
+Run from the backend folder:
+    python -m load_test.notification_load_test --sockets 2000 --accounts 200 --bursts 5 --burst-size 10
+
+Use --database-url postgresql+psycopg2://... to run against a local, already
+migrated Postgres instead of SQLite.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_DB_PATH = os.path.join(BACKEND_DIR, "load_test", "load_test.db")
+
+# db.database reads DATABASE_URL at import time, so --database-url is applied
+# before the db imports below (the server subprocess inherits it)
+if __name__ == "__main__":
+    _url_parser = argparse.ArgumentParser(add_help=False)
+    _url_parser.add_argument("--database-url")
+    _database_url = _url_parser.parse_known_args()[0].database_url
+    if _database_url:
+        os.environ["DATABASE_URL"] = _database_url
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DEFAULT_DB_PATH}")
+sys.path.append(BACKEND_DIR)
+
+from fastapi import FastAPI
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.compiler import compiles
+
+from db.database import Base, engine, SessionLocal
+from db.models.model_staff import Staff, GenderEnum
+from db.models.model_staff_system_acc import StaffSystemAcc
+from db.models.model_notification import Notification
+from db.models.model_notified_user import NotifiedUser
+from db.models.model_notification_subscription import NotificationSubscription
+from notification.websocket_routes import router as websocket_router
+from notification.websocket_manager import manager
+from notification.notification_service import notify_superusers
+
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_bigint(type_, compiler, **kw):
+    # SQLite only auto-increments INTEGER PRIMARY KEY columns
+    return "INTEGER"
+
+
+# ---------------------------------------------------------------- server side
+
+app = FastAPI()
+app.include_router(websocket_router)
+
+
+@app.post("/load-test/burst")
+def burst(count: int = 1):
+    """Creates `count` notifications, each message carries its creation time."""
+    db = SessionLocal()
+    try:
+        for seq in range(count):
+            notify_superusers(json.dumps({"seq": seq, "sent_at": time.time()}), db)
+    finally:
+        db.close()
+    return {"created": count}
+
+
+@app.get("/load-test/stats")
+def stats():
+    return {"rss_bytes": _rss_bytes(), **manager.stats()}
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        # no procfs (macOS): peak RSS is the best figure the stdlib offers
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    except ImportError:
+        pass
+    try:
+        # Windows has neither, psutil reports the current RSS when it is installed
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return 0
+
+
+def prepare_database(accounts: int):
+    """Creates the notification tables (SQLite only) and seeds `accounts` superusers."""
+    if engine.dialect.name == "sqlite":
+        db_path = engine.url.database
+        if db_path and os.path.exists(db_path):
+            engine.dispose()
+            os.remove(db_path)
+        Base.metadata.create_all(engine, tables=[
+            Staff.__table__, StaffSystemAcc.__table__, Notification.__table__,
+            NotifiedUser.__table__, NotificationSubscription.__table__,
+        ])
+
+    db = SessionLocal()
+    try:
+        # ids far above any real staff, so a shared Postgres is not disturbed
+        first_id = 9_000_000
+        db.query(NotifiedUser).filter(NotifiedUser.account_id >= first_id).delete()
+        db.query(StaffSystemAcc).filter(StaffSystemAcc.account_id >= first_id).delete()
+        db.query(Staff).filter(Staff.staff_id >= first_id).delete()
+        db.commit()
+
+        for i in range(accounts):
+            account_id = first_id + i
+            db.add(Staff(staff_id=account_id, first_name="Load", last_name=f"Test{i}", ic_no="000000-00-0000",
+                         email=f"load.test{i}@example.com", date_of_birth=date(1990, 1, 1),
+                         gender=GenderEnum.male, job_title="Load Test", is_active=True))
+        db.flush()
+        for i in range(accounts):
+            account_id = first_id + i
+            db.add(StaffSystemAcc(account_id=account_id, account_holder_name=f"Load Test{i}", staff_id=account_id,
+                                  email=f"load.test{i}@example.com", password_hash="-",
+                                  last_login_at=datetime.now(ZoneInfo("Asia/Kuala_Lumpur")), is_super=True, first_time_login=False))
+        db.commit()
+        return list(range(first_id, first_id + accounts))
+    finally:
+        db.close()
+
+
+# ---------------------------------------------------------------- client side
+
+class ClientStats:
+    def __init__(self):
+        self.connected = 0
+        self.connect_failures = 0
+        self.received = 0
+        self.latencies = []
+
+
+async def run_client(url: str, stats: ClientStats, stop: asyncio.Event, connect_limit: asyncio.Semaphore):
+    from websockets.asyncio.client import connect
+
+    try:
+        async with connect_limit:
+            ws = await connect(url, open_timeout=30, ping_interval=None, max_queue=None)
+    except Exception:
+        stats.connect_failures += 1
+        return
+    stats.connected += 1
+
+    try:
+        while not stop.is_set():
+            try:
+                raw = await asyncio.wait_for(ws.recv(), timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+            received_at = time.time()
+            data = json.loads(raw)
+            if data.get("type") == "ping":
+                await ws.send(json.dumps({"type": "pong"}))
+                continue
+            if "notification_id" in data:
+                stats.received += 1
+                stats.latencies.append(received_at - json.loads(data["message"])["sent_at"])
+    except Exception:
+        pass
+    finally:
+        await ws.close()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_load(args, account_ids):
+    import httpx
+
+    base_http = f"http://{args.host}:{args.port}"
+    base_ws = f"ws://{args.host}:{args.port}"
+    stats = ClientStats()
+    stop = asyncio.Event()
+    connect_limit = asyncio.Semaphore(args.connect_concurrency)
+
+    async with httpx.AsyncClient(base_url=base_http, timeout=120) as http:
+        idle = (await http.get("/load-test/stats")).json()
+
+        started = time.perf_counter()
+        clients = [
+            asyncio.create_task(run_client(f"{base_ws}/ws/{account_ids[i % len(account_ids)]}",
+                                           stats, stop, connect_limit))
+            for i in range(args.sockets)
+        ]
+        while stats.connected + stats.connect_failures < args.sockets:
+            await asyncio.sleep(0.05)
+        connect_seconds = time.perf_counter() - started
+        connected = (await http.get("/load-test/stats")).json()
+
+        for _ in range(args.bursts):
+            await http.post("/load-test/burst", params={"count": args.burst_size})
+            await asyncio.sleep(args.burst_interval)
+
+        expected = stats.connected * args.bursts * args.burst_size
+        deadline = time.perf_counter() + args.drain_timeout
+        while stats.received < expected and time.perf_counter() < deadline:
+            await asyncio.sleep(0.1)
+
+        after = (await http.get("/load-test/stats")).json()
+        stop.set()
+        await asyncio.gather(*clients, return_exceptions=True)
+
+    latencies_ms = [latency * 1000 for latency in stats.latencies]
+    report = {
+        "sockets_requested": args.sockets,
+        "sockets_connected": stats.connected,
+        "connect_failures": stats.connect_failures,
+        "connect_rate_per_s": round(stats.connected / connect_seconds, 1) if connect_seconds else None,
+        "messages_expected": expected,
+        "messages_received": stats.received,
+        "messages_dropped": max(expected - stats.received, 0),
+        "latency_ms": {
+            "p50": round(percentile(latencies_ms, 50), 2),
+            "p90": round(percentile(latencies_ms, 90), 2),
+            "p99": round(percentile(latencies_ms, 99), 2),
+            "max": round(max(latencies_ms), 2) if latencies_ms else 0.0,
+            "mean": round(statistics.fmean(latencies_ms), 2) if latencies_ms else 0.0,
+        },
+        "server_rss_mb": {
+            "idle": round(idle["rss_bytes"] / 2 ** 20, 1),
+            "connected": round(connected["rss_bytes"] / 2 ** 20, 1),
+            "after_bursts": round(after["rss_bytes"] / 2 ** 20, 1),
+        },
+        "server_rss_per_socket_kb": round(
+            (connected["rss_bytes"] - idle["rss_bytes"]) / max(stats.connected, 1) / 1024, 1),
+        "registry_bytes_per_connection": connected["bytes_per_connection"],
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+
+def _raise_fd_limit():
+    try:
+        import resource
+    except ImportError:
+        # Windows: no RLIMIT_NOFILE to raise
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Notification WebSocket load test")
+    parser.add_argument("--sockets", type=int, default=1000, help="client sockets to open")
+    parser.add_argument("--accounts", type=int, default=200, help="superuser accounts the sockets are spread over")
+    parser.add_argument("--bursts", type=int, default=3)
+    parser.add_argument("--burst-size", type=int, default=10, help="notify_superusers calls per burst")
+    parser.add_argument("--burst-interval", type=float, default=1.0, help="seconds between bursts")
+    parser.add_argument("--drain-timeout", type=float, default=30.0, help="seconds to wait for outstanding frames")
+    parser.add_argument("--connect-concurrency", type=int, default=200, help="handshakes in flight at once")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database-url", default=None, help="defaults to a SQLite file next to this script")
+    args = parser.parse_args()
+
+    _raise_fd_limit()
+    account_ids = prepare_database(args.accounts)
+
+    env = dict(os.environ)
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    env["WS_MAX_CONNECTIONS"] = str(args.sockets + 1)
+    env["WS_MAX_CONNECTIONS_PER_ACCOUNT"] = str(-(-args.sockets // args.accounts) + 1)
+
+    server = subprocess.Popen(
+        [sys.executable, "-c",
+         "import uvicorn\n"
+         "from load_test.notification_load_test import _raise_fd_limit\n"
+         "_raise_fd_limit()\n"
+         f"uvicorn.run('load_test.notification_load_test:app', host='{args.host}', port={args.port},"
+         " log_level='warning', ws_max_queue=1024, backlog=4096)"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        _wait_for_server(args.host, args.port)
+        asyncio.run(run_load(args, account_ids))
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def _wait_for_server(host: str, port: int, timeout: float = 30.0):
+    import socket
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"load test server did not start on {host}:{port}")
+
+
+if __name__ == "__main__":
+    main()
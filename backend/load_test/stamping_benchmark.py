@@ -0,0 +1,91 @@
+"""
+Benchmark of the QR stamping stage on 1, 50 and 500 page PDFs.
+
+Compares the previous approach (fresh QR render + full rewrite of the PDF with
+garbage collection) with document_processor.qr_stamper.stamp_qr (cached QR,
+pre-parsed overlay, incremental save), reporting mean time per document and
+the output size.
+
+Run from the backend folder:
+    python -m load_test.stamping_benchmark --runs 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fitz  # PyMuPDF
+
+from document_processor import qr_stamper
+
+PAGE_COUNTS = (1, 50, 500)
+
+
+def make_pdf(path: Path, pages: int):
+    """A text heavy A4 document, roughly what a scanned-and-OCRed certificate weighs per page."""
+    doc = fitz.open()
+    filler = " ".join(["Lorem ipsum dolor sit amet, consectetur adipiscing elit."] * 40)
+    for number in range(pages):
+        page = doc.new_page(width=595, height=842)
+        page.insert_textbox(fitz.Rect(50, 50, 545, 792), f"Page {number + 1}\n\n{filler}", fontsize=9)
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def full_rewrite_stamp(src_path: Path, out_path: Path, url: str):
+    """The stamping stage before caching and incremental saves."""
+    with fitz.open(src_path) as doc:
+        page = doc[0]
+        rect = page.rect
+        qr_rect = fitz.Rect(rect.x1 - 90, rect.y1 - 90, rect.x1 - 18, rect.y1 - 18)
+        page.insert_image(qr_rect, stream=qr_stamper.render_qr_png.__wrapped__(url))
+        doc.save(out_path, garbage=3, deflate=True)
+
+
+def time_runs(fn, src: Path, out_dir: Path, runs: int, same_url: bool):
+    timings, size = [], 0
+    url = f"http://127.0.0.1:8050/view/{uuid.uuid4()}"
+    for _ in range(runs):
+        if not same_url:
+            url = f"http://127.0.0.1:8050/view/{uuid.uuid4()}"
+        out = out_dir / f"{uuid.uuid4().hex}.pdf"
+        started = time.perf_counter()
+        fn(src, out, url)
+        timings.append((time.perf_counter() - started) * 1000)
+        size = out.stat().st_size
+        out.unlink()
+    return statistics.fmean(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QR stamping benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="stamps per document size and method")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        print(f"{'pages':>6} {'source KB':>10} | {'full rewrite ms':>16} {'KB':>8} | "
+              f"{'incremental ms':>15} {'KB':>8} | {'incr. cached QR ms':>19}")
+        for pages in PAGE_COUNTS:
+            src = tmp_dir / f"source_{pages}.pdf"
+            make_pdf(src, pages)
+
+            # warm up fonts / overlay so the first size is not penalised
+            time_runs(qr_stamper.stamp_qr, src, tmp_dir, 1, same_url=False)
+
+            full_ms, full_size = time_runs(full_rewrite_stamp, src, tmp_dir, args.runs, same_url=False)
+            incr_ms, incr_size = time_runs(qr_stamper.stamp_qr, src, tmp_dir, args.runs, same_url=False)
+            cached_ms, _ = time_runs(qr_stamper.stamp_qr, src, tmp_dir, args.runs, same_url=True)
+
+            print(f"{pages:>6} {src.stat().st_size / 1024:>10.1f} | {full_ms:>16.2f} {full_size / 1024:>8.1f} | "
+                  f"{incr_ms:>15.2f} {incr_size / 1024:>8.1f} | {cached_ms:>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
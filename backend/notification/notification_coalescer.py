@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Events of the same (kind, actor) arriving within this many seconds are merged
+COALESCE_WINDOW_SECONDS = float(os.getenv("NOTIFICATION_COALESCE_WINDOW_SECONDS", "2"))
+# Item references kept in a merged notification's detail, the count is always exact
+COALESCE_MAX_DETAIL_ITEMS = int(os.getenv("NOTIFICATION_COALESCE_MAX_DETAIL_ITEMS", "100"))
+
+
+class CoalescedBucket:
+    """
+    Events collected for one (kind, actor_id) key during one window.
+
+    Attributes:
+        kind (str): Event kind.
+        actor_id (Optional[int]): Account that caused the events.
+        first_message (str): Message of the first event, used when nothing was merged.
+        summary (Optional[str]): Template for the merged message, may use {count}.
+        count (int): Number of events collected.
+        item_refs (List[str]): Up to COALESCE_MAX_DETAIL_ITEMS item references.
+        first_at (float): time.time() of the first event.
+        last_at (float): time.time() of the latest event.
+    """
+    __slots__ = ("kind", "actor_id", "first_message", "summary", "count", "item_refs", "first_at", "last_at")
+
+    def __init__(self, kind: str, actor_id: Optional[int], message: str, summary: Optional[str]):
+        now = time.time()
+        self.kind = kind
+        self.actor_id = actor_id
+        self.first_message = message
+        self.summary = summary
+        self.count = 0
+        self.item_refs: List[str] = []
+        self.first_at = now
+        self.last_at = now
+
+    @property
+    def message(self) -> str:
+        if self.count == 1:
+            return self.first_message
+        if self.summary:
+            return self.summary.format(count=self.count)
+        return f"{self.first_message} (and {self.count - 1} more)"
+
+
+class NotificationCoalescer:
+    """
+    Merges bursts of notification events keyed by (kind, actor_id).
+
+    The first event of a key opens a window, every event of the same key that
+    arrives before the window closes is folded into the same bucket. When the
+    window closes the bucket is handed to on_flush, which writes and pushes a
+    single notification for the whole burst.
+
+    Args:
+        on_flush (Callable[[CoalescedBucket], None]): Called from a timer thread with each closed bucket.
+        window_seconds (float): Length of the coalescing window.
+    """
+
+    def __init__(self, on_flush: Callable[[CoalescedBucket], None],
+                 window_seconds: float = COALESCE_WINDOW_SECONDS):
+        self.on_flush = on_flush
+        self.window_seconds = window_seconds
+        self._buckets: Dict[Tuple[str, Optional[int]], CoalescedBucket] = {}
+        self._lock = threading.Lock()
+
+    def add(self, kind: str, actor_id: Optional[int], message: str,
+            item_ref: Optional[str] = None, summary: Optional[str] = None):
+        """
+        Adds one event to the bucket of its key, opening a window if there is none.
+
+        Args:
+            kind (str): Event kind.
+            actor_id (Optional[int]): Account that caused the event.
+            message (str): Message of this event.
+            item_ref (Optional[str]): Reference of the affected item.
+            summary (Optional[str]): Template for the merged message, may use {count}.
+        """
+        key = (kind, actor_id)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = CoalescedBucket(kind, actor_id, message, summary)
+                self._buckets[key] = bucket
+                timer = threading.Timer(self.window_seconds, self._flush_key, args=(key,))
+                timer.daemon = True
+                timer.start()
+
+            bucket.count += 1
+            bucket.last_at = time.time()
+            if item_ref is not None and len(bucket.item_refs) < COALESCE_MAX_DETAIL_ITEMS:
+                bucket.item_refs.append(item_ref)
+
+    def flush_all(self):
+        """
+        Closes every open window immediately, e.g. on shutdown.
+        """
+        with self._lock:
+            keys = list(self._buckets)
+        for key in keys:
+            self._flush_key(key)
+
+    def _flush_key(self, key: Tuple[str, Optional[int]]):
+        with self._lock:
+            bucket = self._buckets.pop(key, None)
+        if bucket is None:
+            return
+        try:
+            self.on_flush(bucket)
+        except Exception as e:
+            print(f"[Notify Error] Failed to flush coalesced {bucket.kind} notification: {e}")
@@ -1,72 +1,188 @@
+import atexit
+import json
 from datetime import datetime
+from typing import List, Optional
 from zoneinfo import ZoneInfo
 
 from sqlalchemy.orm import Session
-from .websocket_manager import manager
+from .websocket_manager import manager, ConnectionRecord
 from db.models.model_notification import Notification
 from db.models.model_notified_user import NotifiedUser
+from db.models.model_notification_subscription import NotificationSubscription, NotificationTopic
 from db.models.model_staff_system_acc import StaffSystemAcc
 import asyncio
-from fastapi import WebSocket
 from db.database import SessionLocal
+from .notification_coalescer import NotificationCoalescer, CoalescedBucket
 
 
-def notify_superusers(message: str, db: Session) -> Notification:
+def notify_superusers(message: str, db: Session,
+                      topic: Optional[NotificationTopic] = None,
+                      actor_id: Optional[int] = None,
+                      item_ref: Optional[str] = None,
+                      summary: Optional[str] = None,
+                      coalesce: bool = False) -> Optional[Notification]:
     """
-    Create a notification and notify all superusers (including the current actor).
-    This is sync, returns the Notification object in case it's needed.
+    Create a notification and notify all superusers (including the current actor)
+    subscribed to its topic. This is sync, returns the Notification object in case it's needed.
+
+    With coalesce=True (and a topic), the event is handed to the coalescer instead:
+    events of the same (topic, actor_id) arriving within the coalescing window are
+    merged into one summarized notification, written and pushed when the window
+    closes. None is returned in that case.
+
+    Args:
+        message (str): Notification text, used as-is when the event is not merged.
+        db (Session): Request database session.
+        topic (Optional[NotificationTopic]): Event topic, used to pick subscribers and as part of
+            the coalescing key. None notifies every superuser.
+        actor_id (Optional[int]): Account that caused the event. Part of the coalescing key.
+        item_ref (Optional[str]): Reference of the affected item (e.g. document id), kept in the detail.
+        summary (Optional[str]): Message template for a merged notification, may use {count}.
+        coalesce (bool): Opt in to coalescing.
     """
-    try:
-        # 1. Create Notification record
-        notification = Notification(message=message)
-        db.add(notification)
-        db.commit()
-        db.refresh(notification)
+    if coalesce and topic:
+        coalescer.add(topic, actor_id, message, item_ref, summary)
+        return None
 
-        # 2. Get all superusers
-        superusers = db.query(StaffSystemAcc).filter(StaffSystemAcc.is_super.is_(True)).all()
+    detail = None
+    if item_ref is not None:
+        detail = json.dumps({"topic": topic, "actor_id": actor_id, "items": [item_ref]})
 
-        # 3. Create NotifiedUser records
-        for user in superusers:
-            notified = NotifiedUser(
-                account_id=user.account_id,
-                notification_id=notification.notification_id,
-                has_received=False
-            )
-            db.add(notified)
+    return create_and_push_notification(db, message, topic=topic, item_count=1, detail=detail)
 
-        db.commit()
 
-        # 4. Attempt real-time push
-        for user in superusers:
-            ws = manager.get_connection(user.account_id)
-            if ws:
-                asyncio.create_task(_send_and_mark_received(
-                    ws, user.account_id, notification
-                ))
+def create_and_push_notification(db: Session, message: str,
+                                 topic: Optional[NotificationTopic] = None,
+                                 item_count: int = 1,
+                                 detail: Optional[str] = None) -> Notification:
+    """
+    Writes the Notification and its NotifiedUser rows for the superusers subscribed
+    to topic, then pushes it to every open socket of the recipients. Safe to call from the event loop, from a
+    threadpool worker or from the coalescer's timer thread.
+
+    Args:
+        db (Session): Database session.
+        message (str): Notification text.
+        topic (Optional[NotificationTopic]): Topic of the notification, None reaches every superuser.
+        item_count (int): Number of events represented by this notification.
+        detail (Optional[str]): JSON pointer to the affected items.
+
+    Returns:
+        Notification: The created notification.
+    """
+    # 1. Create Notification record
+    notification = Notification(message=message, topic=topic, item_count=item_count, detail=detail)
+    db.add(notification)
+    db.commit()
+    db.refresh(notification)
 
+    # 2. Get the superusers subscribed to the topic
+    superuser_ids = get_subscribed_superuser_ids(db, topic)
+    if not superuser_ids:
         return notification
 
+    # 3. Create NotifiedUser records
+    db.bulk_insert_mappings(NotifiedUser, [
+        {
+            "account_id": account_id,
+            "notification_id": notification.notification_id,
+            "has_received": False,
+        }
+        for account_id in superuser_ids
+    ])
+    db.commit()
+
+    # 4. Attempt real-time push. The payload is built now, the ORM object
+    # expires on commit and the session may be closed by the time it is sent.
+    payload = _to_payload(notification, has_read=False)
+    for account_id in superuser_ids:
+        for record in manager.get_connections(account_id):
+            _dispatch(_send_and_mark_received(record, account_id, payload))
+
+    return notification
+
+
+def get_subscribed_superuser_ids(db: Session, topic: Optional[NotificationTopic]) -> List[int]:
+    """
+    Superusers that should receive a notification of the given topic. Accounts are
+    subscribed by default, only an explicit is_subscribed = False row opts one out.
+
+    Args:
+        db (Session): Database session.
+        topic (Optional[NotificationTopic]): Topic of the notification, None means every superuser.
+
+    Returns:
+        List[int]: Recipient account IDs.
+    """
+    query = db.query(StaffSystemAcc.account_id).filter(StaffSystemAcc.is_super.is_(True))
+
+    if topic is not None:
+        opted_out = (
+            db.query(NotificationSubscription.account_id)
+            .filter(
+                NotificationSubscription.topic == topic,
+                NotificationSubscription.is_subscribed.is_(False)
+            )
+        )
+        query = query.filter(StaffSystemAcc.account_id.not_in(opted_out))
+
+    return [account_id for (account_id,) in query.all()]
+
+
+def _flush_coalesced(bucket: CoalescedBucket):
+    """
+    Writes one summarized notification for a closed coalescing window.
+    Runs on the coalescer's timer thread, so it uses its own session.
+    """
+    detail = json.dumps({
+        "topic": bucket.kind,
+        "actor_id": bucket.actor_id,
+        "items": bucket.item_refs,
+        "from": datetime.fromtimestamp(bucket.first_at, ZoneInfo("Asia/Kuala_Lumpur")).isoformat(),
+        "to": datetime.fromtimestamp(bucket.last_at, ZoneInfo("Asia/Kuala_Lumpur")).isoformat(),
+    })
+
+    db: Session = SessionLocal()
+    try:
+        create_and_push_notification(db, bucket.message, topic=bucket.kind,
+                                     item_count=bucket.count, detail=detail)
     finally:
-        pass
+        db.close()
+
+
+coalescer = NotificationCoalescer(on_flush=_flush_coalesced)
+# open windows are written out on shutdown/reload instead of dying with their timers
+atexit.register(coalescer.flush_all)
+
+
+def _dispatch(coro):
+    """
+    Schedules a coroutine on the event loop that owns the WebSocket connections.
+    """
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
 
+    if running is not None and running is manager.loop:
+        running.create_task(coro)
+    elif manager.loop is not None and not manager.loop.is_closed():
+        asyncio.run_coroutine_threadsafe(coro, manager.loop)
+    else:
+        coro.close()
 
-async def _send_and_mark_received(ws: WebSocket, account_id: int, notification: Notification):
+
+async def _send_and_mark_received(record: ConnectionRecord, account_id: int, payload: dict):
     """
     Sends notification over WebSocket and marks as received.
     """
     db: Session = SessionLocal()
     try:
-        await ws.send_json({
-            "notification_id": notification.notification_id,
-            "message": notification.message,
-            "created_at": str(notification.created_at),
-            "has_read": False,
-        })
+        await manager.send_json(record, payload)
 
         db.query(NotifiedUser).filter_by(
             account_id=account_id,
-            notification_id=notification.notification_id
+            notification_id=payload["notification_id"]
         ).update({
             "has_received": True,
             "received_at": datetime.now(ZoneInfo("Asia/Kuala_Lumpur"))
@@ -80,6 +196,22 @@ async def _send_and_mark_received(ws: WebSocket, account_id: int, notification:
         db.close()
 
 
+def _to_payload(notification: Notification, has_read: bool) -> dict:
+    """
+    Shape of a notification frame pushed over the WebSocket, kept identical
+    to the items returned by GET /notifications/{account_id}.
+    """
+    return {
+        "notification_id": notification.notification_id,
+        "message": notification.message,
+        "created_at": str(notification.created_at),
+        "has_read": bool(has_read),
+        "item_count": notification.item_count or 1,
+        "detail": notification.detail,
+        "topic": notification.topic.value if notification.topic else None,
+    }
+
+
 async def send_undelivered_notifications(user_id: int):
     """
     When a user connects,this function will update the
@@ -103,3 +235,51 @@ async def send_undelivered_notifications(user_id: int):
         db.commit()
     finally:
         db.close()
+
+
+async def replay_notifications_since(record: ConnectionRecord, account_id: int, last_seen_id: int) -> int:
+    """
+    Resume support for a reconnecting client: sends only the notifications
+    newer than the last one the client has seen, oldest first, and marks
+    them as received.
+
+    The client is registered in the ConnectionManager before this runs, so a
+    notification created during the replay may arrive twice (once live, once
+    replayed). The client de-duplicates on notification_id.
+
+    Args:
+        record (ConnectionRecord): The freshly registered connection.
+        account_id (int): The ID of the logged-in user.
+        last_seen_id (int): Highest notification_id the client already holds.
+
+    Returns:
+        int: Number of notifications replayed.
+    """
+    db: Session = SessionLocal()
+    try:
+        results = (
+            db.query(NotifiedUser.notified_id, NotifiedUser.has_read, Notification)
+            .join(Notification, Notification.notification_id == NotifiedUser.notification_id)
+            .filter(
+                NotifiedUser.account_id == account_id,
+                NotifiedUser.notification_id > last_seen_id
+            )
+            .order_by(NotifiedUser.notification_id.asc())
+            .all()
+        )
+
+        for _, has_read, notification in results:
+            await manager.send_json(record, _to_payload(notification, has_read))
+
+        if results:
+            db.query(NotifiedUser).filter(
+                NotifiedUser.notified_id.in_([notified_id for notified_id, _, _ in results]),
+                NotifiedUser.has_received.is_not(True)
+            ).update({"has_received": True,
+                      "received_at": datetime.now(ZoneInfo("Asia/Kuala_Lumpur"))},
+                     synchronize_session=False)
+            db.commit()
+
+        return len(results)
+    finally:
+        db.close()
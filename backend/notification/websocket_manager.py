@@ -1,61 +1,185 @@
-from typing import Dict, Optional
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
 from fastapi import WebSocket
 
+# Heartbeat / reaping settings, override through the environment (.env)
+PING_INTERVAL_SECONDS = float(os.getenv("WS_PING_INTERVAL_SECONDS", "25"))
+IDLE_TIMEOUT_SECONDS = float(os.getenv("WS_IDLE_TIMEOUT_SECONDS", "60"))
+MAX_CONNECTIONS_PER_ACCOUNT = int(os.getenv("WS_MAX_CONNECTIONS_PER_ACCOUNT", "5"))
+MAX_CONNECTIONS = int(os.getenv("WS_MAX_CONNECTIONS", "10000"))
+# a ping not written within this time counts as a dead peer
+SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "5"))
+
+PING_FRAME = json.dumps({"type": "ping"})
+# close code of a socket evicted by a newer tab of the same account, the
+# frontend does not reconnect on it (otherwise evicted tabs would evict each other forever)
+CLOSE_EVICTED = 4001
+
+
+class ConnectionRecord:
+    """
+    One open WebSocket and its bookkeeping. Uses __slots__ so every
+    connection costs a fixed, small amount of memory (no per-instance __dict__).
+
+    Attributes:
+        websocket (WebSocket): The WebSocket connection.
+        account_id (int): Owner of the connection.
+        connected_at (float): time.monotonic() at accept.
+        last_activity (float): time.monotonic() of the last frame received from the client.
+        bytes_sent (int): Payload bytes pushed to the client.
+        messages_sent (int): Frames pushed to the client.
+    """
+    __slots__ = ("websocket", "account_id", "connected_at", "last_activity", "bytes_sent", "messages_sent")
+
+    def __init__(self, account_id: int, websocket: WebSocket):
+        now = time.monotonic()
+        self.websocket = websocket
+        self.account_id = account_id
+        self.connected_at = now
+        self.last_activity = now
+        self.bytes_sent = 0
+        self.messages_sent = 0
+
 
 class ConnectionManager:
     """
     Manages active WebSocket connections for each logged-in user.
 
+    A user may hold several sockets at once (one per browser tab), each is tracked
+    separately. A background heartbeat pings every socket and reaps the ones that
+    stopped answering, so dead TCP peers that never sent a close frame do not stay
+    registered forever.
+
     Attributes:
-        active_connections (Dict[int, WebSocket]): Maps account_id to WebSocket connection.
+        active_connections (Dict[int, List[ConnectionRecord]]): Maps account_id to its open connections.
     """
 
-    def __init__(self):
-        self.active_connections: Dict[int, WebSocket] = {}
+    def __init__(self,
+                 ping_interval: float = PING_INTERVAL_SECONDS,
+                 idle_timeout: float = IDLE_TIMEOUT_SECONDS,
+                 max_per_account: int = MAX_CONNECTIONS_PER_ACCOUNT,
+                 max_connections: int = MAX_CONNECTIONS,
+                 send_timeout: float = SEND_TIMEOUT_SECONDS):
+        self.active_connections: Dict[int, List[ConnectionRecord]] = {}
+        self.ping_interval = ping_interval
+        self.idle_timeout = idle_timeout
+        self.max_per_account = max_per_account
+        self.max_connections = max_connections
+        self.send_timeout = send_timeout
+        self._connection_count = 0
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        # loop serving the sockets, lets sync code (threadpool, timers) schedule sends
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
 
-    async def connect(self, account_id: int, websocket: WebSocket):
+    async def connect(self, account_id: int, websocket: WebSocket) -> Optional[ConnectionRecord]:
         """
         Accepts and stores a WebSocket connection for the given account_id.
 
+        When the account already holds max_per_account sockets its oldest one is
+        closed with code CLOSE_EVICTED. When the worker is at max_connections
+        the new socket is refused with close code 1013 (try again later).
+
         Args:
             account_id (int): The user account ID.
             websocket (WebSocket): The WebSocket connection.
+
+        Returns:
+            Optional[ConnectionRecord]: The registered connection, or None if refused.
         """
         await websocket.accept()
-        self.active_connections[account_id] = websocket
+        self.loop = asyncio.get_running_loop()
+
+        if self._connection_count >= self.max_connections:
+            await websocket.close(code=1013)
+            return None
 
-    def disconnect(self, account_id: int):
+        records = self.active_connections.setdefault(account_id, [])
+        while len(records) >= self.max_per_account:
+            oldest = records[0]
+            self._remove(oldest)
+            await self._close_quietly(oldest.websocket, CLOSE_EVICTED)
+
+        record = ConnectionRecord(account_id, websocket)
+        records.append(record)
+        self._connection_count += 1
+        self.start_heartbeat()
+        return record
+
+    def disconnect(self, account_id: int, websocket: WebSocket):
         """
-        Removes the WebSocket connection for the given account_id, if it exists.
+        Removes the given WebSocket connection of account_id, if it exists.
+        Other sockets (tabs) of the same account are left untouched.
 
         Args:
             account_id (int): The user account ID.
+            websocket (WebSocket): The WebSocket connection to remove.
         """
-        self.active_connections.pop(account_id, None)
+        for record in self.active_connections.get(account_id, ()):
+            if record.websocket is websocket:
+                self._remove(record)
+                return
 
-    def get_connection(self, account_id: int) -> Optional[WebSocket]:
+    def get_connections(self, account_id: int) -> List[ConnectionRecord]:
         """
-        Retrieves the WebSocket connection for a given account_id.
+        Retrieves every open connection for a given account_id.
 
         Args:
             account_id (int): The user account ID.
 
         Returns:
-            Optional[WebSocket]: The user's WebSocket if connected, else None.
+            List[ConnectionRecord]: The user's connections, empty if not connected.
+        """
+        return list(self.active_connections.get(account_id, ()))
+
+    def touch(self, record: ConnectionRecord):
+        """
+        Records client activity (any received frame, including pong) on a connection.
+
+        Args:
+            record (ConnectionRecord): The connection that received a frame.
+        """
+        record.last_activity = time.monotonic()
+
+    async def send_text(self, record: ConnectionRecord, message: str):
+        """
+        Sends a text frame on one connection and updates its counters.
+
+        Args:
+            record (ConnectionRecord): The target connection.
+            message (str): The message to send.
+        """
+        await record.websocket.send_text(message)
+        record.bytes_sent += len(message)
+        record.messages_sent += 1
+
+    async def send_json(self, record: ConnectionRecord, payload: dict):
+        """
+        Serializes payload to JSON and sends it on one connection.
+
+        Args:
+            record (ConnectionRecord): The target connection.
+            payload (dict): JSON-serializable payload.
         """
-        return self.active_connections.get(account_id)
+        await self.send_text(record, json.dumps(payload, separators=(",", ":")))
 
     async def send_to_user(self, account_id: int, message: str):
         """
-        Sends a message to a specific user via WebSocket.
+        Sends a message to every open connection of a specific user.
 
         Args:
             account_id (int): The recipient's account ID.
             message (str): The message to send.
         """
-        connection = self.get_connection(account_id)
-        if connection:
-            await connection.send_text(message)
+        for record in self.get_connections(account_id):
+            try:
+                await self.send_text(record, message)
+            except Exception as e:
+                print(f"Failed to send to account {account_id}: {e}")
+                self._remove(record)
 
     async def broadcast(self, message: str):
         """
@@ -64,11 +188,99 @@ class ConnectionManager:
         Args:
             message (str): The message to broadcast.
         """
-        for connection in self.active_connections.values():
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                print(f"Failed to send to one connection: {e}")
+        for records in list(self.active_connections.values()):
+            for record in list(records):
+                try:
+                    await self.send_text(record, message)
+                except Exception as e:
+                    print(f"Failed to send to one connection: {e}")
+                    self._remove(record)
+
+    def start_heartbeat(self):
+        """
+        Starts the ping/reap loop on the running event loop if it is not running yet.
+        Called on every connect, so no application startup hook is needed.
+        """
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+    async def _heartbeat_loop(self):
+        while self._connection_count:
+            await asyncio.sleep(self.ping_interval)
+            await self.ping_and_reap()
+
+    async def ping_and_reap(self) -> int:
+        """
+        Closes connections that have been silent for longer than idle_timeout and
+        pings the rest. A failed ping means the peer is gone, it is reaped as well.
+        The client answers pings with {"type": "pong"}, which refreshes last_activity.
+
+        Pings are sent concurrently, each bounded by send_timeout, so one stalled
+        peer cannot hold back the heartbeat of every other connection.
+
+        Returns:
+            int: Number of connections reaped.
+        """
+        now = time.monotonic()
+        idle: List[ConnectionRecord] = []
+        alive: List[ConnectionRecord] = []
+        for records in list(self.active_connections.values()):
+            for record in records:
+                (idle if now - record.last_activity > self.idle_timeout else alive).append(record)
+
+        for record in idle:
+            self._remove(record)
+        results = await asyncio.gather(
+            *(self._close_quietly(record.websocket) for record in idle),
+            *(asyncio.wait_for(self.send_text(record, PING_FRAME), self.send_timeout) for record in alive),
+            return_exceptions=True,
+        )
+
+        reaped = len(idle)
+        for record, result in zip(alive, results[len(idle):]):
+            if isinstance(result, BaseException):
+                self._remove(record)
+                reaped += 1
+        return reaped
+
+    def stats(self) -> dict:
+        """
+        Connection counts and an estimate of the memory held by the registry.
+        The estimate covers the registry itself (dict, lists, records), the
+        WebSocket objects belong to the ASGI server and are not counted.
+
+        Returns:
+            dict: accounts, connections, registry_bytes and bytes_per_connection.
+        """
+        registry_bytes = sys.getsizeof(self.active_connections)
+        for records in self.active_connections.values():
+            registry_bytes += sys.getsizeof(records)
+            registry_bytes += sum(sys.getsizeof(record) for record in records)
+
+        return {
+            "accounts": len(self.active_connections),
+            "connections": self._connection_count,
+            "max_connections": self.max_connections,
+            "registry_bytes": registry_bytes,
+            "bytes_per_connection": registry_bytes // self._connection_count if self._connection_count else 0,
+        }
+
+    def _remove(self, record: ConnectionRecord):
+        records = self.active_connections.get(record.account_id)
+        if not records or record not in records:
+            return
+        records.remove(record)
+        self._connection_count -= 1
+        if not records:
+            # drop the empty list so idle accounts cost nothing
+            del self.active_connections[record.account_id]
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket, code: int = 1000):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
 
 
 manager = ConnectionManager()
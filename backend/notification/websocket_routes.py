@@ -1,31 +1,49 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
+from typing import Optional
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
 from .websocket_manager import manager
-from notification.notification_service import send_undelivered_notifications
+from notification.notification_service import send_undelivered_notifications, replay_notifications_since
 
 router = APIRouter()
 
 
 @router.websocket("/ws/{account_id}")
-async def websocket_endpoint(websocket: WebSocket, account_id: int):
+async def websocket_endpoint(websocket: WebSocket, account_id: int, last_seen_id: Optional[int] = Query(None)):
     """
     WebSocket endpoint for client to establish real-time notification connection.
 
     When a user connects:
-    - They are registered in ConnectionManager.
-    - Any undelivered notifications are sent.
-    - The connection is kept alive until user disconnects.
+    - They are registered in ConnectionManager (one entry per tab).
+    - If the client passes ?last_seen_id=<id> (a reconnect), only the notifications
+      newer than that id are replayed over the socket, so the client does not have
+      to refetch its whole history.
+    - Otherwise any undelivered notifications are marked as received, the client
+      loads the full list via GET /notifications/{account_id}.
+    - The connection is kept alive until user disconnects. The server sends
+      {"type": "ping"} periodically, every frame from the client (e.g. {"type": "pong"})
+      counts as activity, sockets that stay silent are reaped by the manager.
 
     Args:
         websocket (WebSocket): The WebSocket connection object.
         account_id (int): The ID of the connecting user.
+        last_seen_id (Optional[int]): Highest notification_id the client already has.
     """
-    print(f"WebSocket CONNECTED for user {account_id}")
+    print(f"WebSocket CONNECTED for user {account_id} (last_seen_id={last_seen_id})")
+
+    record = await manager.connect(account_id, websocket)
+    if record is None:
+        return
 
-    await manager.connect(account_id, websocket)
-    await send_undelivered_notifications(account_id)
     try:
-        while True:
-            await websocket.receive_text()  # Keeps connection alive
-    except WebSocketDisconnect:
-        manager.disconnect(account_id)
+        if last_seen_id is not None:
+            await replay_notifications_since(record, account_id, last_seen_id)
+        else:
+            await send_undelivered_notifications(account_id)
 
+        while True:
+            await websocket.receive_text()
+            manager.touch(record)
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the socket was already closed by the reaper
+        pass
+    finally:
+        manager.disconnect(account_id, websocket)
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# the backend modules import each other as top-level packages (db, api, ...)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# db.database needs a DATABASE_URL at import time, the unit tests never connect
+os.environ.setdefault("DATABASE_URL", os.getenv("TEST_DATABASE_URL") or "sqlite://")
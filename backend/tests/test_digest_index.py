@@ -0,0 +1,121 @@
+"""
+IssuedDigestIndex in front of DocumentRecord.hash: the Bloom filter itself, and
+refreshes that re-read their overlap window without inflating the item count.
+The db reads are replaced by an in-memory table.
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from document_processor import digest_index
+from document_processor.digest_index import BloomFilter, IssuedDigestIndex
+
+
+def _digest(i: int) -> bytes:
+    return hashlib.sha256(str(i).encode()).digest()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.001)
+    for i in range(1000):
+        bloom.add(_digest(i))
+
+    assert all(_digest(i) in bloom for i in range(1000))
+    false_positives = sum(_digest(i) in bloom for i in range(1000, 11000))
+    assert false_positives < 50
+
+
+def test_bloom_filter_counts_each_digest_once():
+    bloom = BloomFilter(100, 0.001)
+    assert bloom.add(_digest(1)) is True
+    assert bloom.add(_digest(1)) is False
+    bloom.add(_digest(2))
+
+    assert bloom.count == 2
+
+
+class _FakeIndex(IssuedDigestIndex):
+    """Reads from self.rows instead of the db and counts the reads."""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self.fetches = 0
+
+    def _count_documents(self) -> int:
+        return len(self.rows)
+
+    def _fetch_rows(self, since):
+        self.fetches += 1
+        return [(digest, created_at) for digest, created_at in self.rows if since is None or created_at >= since]
+
+
+@pytest.fixture
+def index(monkeypatch):
+    monkeypatch.setattr(digest_index, "BLOOM_EXPECTED_DOCUMENTS", 10)
+    index = _FakeIndex()
+    now = datetime.now(ZoneInfo("Asia/Kuala_Lumpur"))
+    index.rows = [(_digest(i), now - timedelta(seconds=i)) for i in range(5)]
+    return index
+
+
+def test_repeated_refreshes_do_not_grow_the_filter(index):
+    index.refresh()
+    capacity = index.stats()["capacity"]
+
+    for _ in range(50):
+        # every refresh re-reads the whole 60 s overlap window, add() has counted some of it already
+        index.add(digest for digest, _ in index.rows)
+        index.refresh()
+
+    assert index.stats()["items"] == 5
+    assert index.stats()["capacity"] == capacity
+
+
+def test_rebuild_is_sized_from_the_row_count(index):
+    index.refresh()
+    now = datetime.now(ZoneInfo("Asia/Kuala_Lumpur"))
+    index.rows += [(_digest(i), now) for i in range(5, 15)]
+    index.refresh()
+    assert index.stats()["items"] > index.stats()["capacity"]
+
+    index.refresh()
+    assert index.stats()["capacity"] == 30
+    assert all(index.might_contain(digest) for digest, _ in index.rows)
+
+
+def test_refresh_skips_a_fresh_filter(index):
+    index.refresh()
+    fetches = index.fetches
+
+    assert index.refresh(max_staleness=60) is False
+    assert index.fetches == fetches
+    assert index.refresh(max_staleness=0) is True
+    assert index.fetches == fetches + 1
+
+
+def test_concurrent_negative_lookups_refresh_once(index, monkeypatch):
+    monkeypatch.setattr(digest_index, "BLOOM_MAX_STALENESS_SECONDS", 0.5)
+    index.refresh()
+    index._refreshed_at = time.monotonic() - 1
+    fetches = index.fetches
+
+    fetch_rows = index._fetch_rows
+
+    def slow_fetch(since):
+        time.sleep(0.05)
+        return fetch_rows(since)
+
+    index._fetch_rows = slow_fetch
+    threads = [threading.Thread(target=index.might_contain, args=(_digest(-1),)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert index.fetches == fetches + 1
+    assert index.rejected == 8
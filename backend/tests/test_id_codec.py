@@ -0,0 +1,84 @@
+"""
+doc_encrypted_id: round trips, rejects tampered or truncated tokens, and the
+batch encoder agrees with the single one.
+"""
+import os
+import uuid
+
+import pytest
+
+from document_processor import id_codec
+from document_processor.id_codec import TOKEN_LENGTH, DocIdCodec
+
+
+@pytest.fixture
+def codec():
+    return DocIdCodec(os.urandom(32), decode_cache_size=8)
+
+
+def test_round_trip(codec):
+    doc_record_id = uuid.uuid4()
+    token = codec.encode(doc_record_id)
+
+    assert len(token) == TOKEN_LENGTH
+    assert token == codec.encode(doc_record_id)
+    assert codec.decode(token) == doc_record_id
+
+
+def test_encode_many_matches_encode(codec):
+    ids = [uuid.uuid4() for _ in range(20)]
+    assert codec.encode_many(ids) == [codec.encode(doc_record_id) for doc_record_id in ids]
+    assert codec.encode_many([]) == []
+
+
+@pytest.mark.parametrize("tamper", [
+    lambda token: token[:-1],
+    lambda token: token + "A",
+    lambda token: ("B" if token[0] != "B" else "C") + token[1:],
+    lambda token: token[:20] + ("x" if token[20] != "x" else "y") + token[21:],
+    lambda token: "!" * TOKEN_LENGTH,
+    lambda token: "",
+    lambda token: str(uuid.uuid4()),
+])
+def test_tampered_or_truncated_token_is_rejected(codec, tamper):
+    token = codec.encode(uuid.uuid4())
+    with pytest.raises(ValueError):
+        codec.decode(tamper(token))
+
+
+def test_token_from_another_key_is_rejected(codec):
+    token = DocIdCodec(os.urandom(32)).encode(uuid.uuid4())
+    with pytest.raises(ValueError):
+        codec.decode(token)
+
+
+def test_decode_cache(codec):
+    tokens = [codec.encode(uuid.uuid4()) for _ in range(10)]
+    for token in tokens:
+        codec.decode(token)
+    codec.decode(tokens[-1])
+
+    info = codec.decode.cache_info()
+    assert info.hits == 1
+    assert info.currsize == 8
+
+    # a rejected token is not cached, the next attempt raises again
+    with pytest.raises(ValueError):
+        codec.decode("A" * TOKEN_LENGTH)
+    with pytest.raises(ValueError):
+        codec.decode("A" * TOKEN_LENGTH)
+
+
+def test_module_helpers_use_doc_id_key(monkeypatch):
+    monkeypatch.setattr(id_codec, "_codec", None)
+    monkeypatch.setenv("DOC_ID_KEY", os.urandom(32).hex())
+    doc_record_id = uuid.uuid4()
+
+    assert id_codec.decode_doc_id(id_codec.encode_doc_id(doc_record_id)) == doc_record_id
+
+
+def test_missing_key(monkeypatch):
+    monkeypatch.setattr(id_codec, "_codec", None)
+    monkeypatch.delenv("DOC_ID_KEY", raising=False)
+    with pytest.raises(ValueError):
+        id_codec.get_id_codec()
@@ -0,0 +1,123 @@
+"""
+list_documents must cost a fixed number of statements per page, whatever the
+page size (no per-row lazy loads of the deleter, issuer or blobs).
+
+Needs a Postgres (the document model uses TSVECTOR/JSONB): set
+TEST_DATABASE_URL. The tables are created in a throw-away schema.
+"""
+import os
+import uuid
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+if not TEST_DATABASE_URL:
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+# db.database reads DATABASE_URL at import time
+os.environ.setdefault("DATABASE_URL", TEST_DATABASE_URL)
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+from db.case_specified_crud import list_documents
+from db.database import Base
+from db.models.model_owner import GenderEnum as OwnerGender, Owner
+from db.models.model_staff import GenderEnum as StaffGender, Staff
+from db.models.model_staff_system_acc import StaffSystemAcc
+from db.models.models_document_record import DocumentRecord
+
+DOCUMENT_COUNT = 60
+
+
+@pytest.fixture(scope="module")
+def engine():
+    schema = f"test_list_documents_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(TEST_DATABASE_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+
+    engine = create_engine(TEST_DATABASE_URL, connect_args={"options": f"-csearch_path={schema}"})
+    Base.metadata.create_all(engine, tables=[
+        Owner.__table__, Staff.__table__, StaffSystemAcc.__table__, DocumentRecord.__table__,
+    ])
+    _seed(engine)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        admin.dispose()
+
+
+def _seed(engine):
+    now = datetime.now(ZoneInfo("Asia/Kuala_Lumpur"))
+    with Session(engine) as db:
+        for i in (1, 2):
+            db.add(Staff(staff_id=i, first_name=f"Staff{i}", last_name="Test", ic_no=f"800101-01-000{i}",
+                         email=f"staff{i}@example.com", date_of_birth=date(1980, 1, 1),
+                         gender=StaffGender.male, job_title="Officer"))
+        db.flush()
+        for i in (1, 2):
+            db.add(StaffSystemAcc(account_id=i, account_holder_name=f"staff{i}", staff_id=i,
+                                  email=f"staff{i}@example.com", password_hash="x", last_login_at=now,
+                                  is_super=True))
+        db.add(Owner(owner_ic_no="900101-01-1111", first_name="Ali", last_name="Bin", email="ali@example.com",
+                     date_of_birth=date(1990, 1, 1), gender=OwnerGender.male, nationality="MY"))
+        db.flush()
+        for i in range(DOCUMENT_COUNT):
+            deleted = i % 2 == 0
+            db.add(DocumentRecord(
+                doc_owner_name="Ali Bin", doc_owner_ic="900101-01-1111", document_type=f"Type{i % 3}",
+                issuer_id=1 + i % 2, issuer_name="Staff Test", issue_date=date(2025, 1, 1),
+                hash=os.urandom(32), signature=os.urandom(64), verification_url="http://localhost/view",
+                created_at=now - timedelta(minutes=i), updated_at=now,
+                is_deleted=deleted, deleted_by=2 if deleted else None, deleted_at=now if deleted else None,
+            ))
+        db.commit()
+
+
+def _count_statements(engine, call):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        result = call()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return result, statements
+
+
+@pytest.mark.parametrize("is_deleted", [False, True])
+def test_statement_count_does_not_depend_on_page_size(engine, is_deleted):
+    counts = {}
+    for limit in (1, 10, DOCUMENT_COUNT):
+        with Session(engine) as db:
+            def page():
+                rows, total = list_documents(db, is_deleted, limit=limit)
+                # touch everything the listing endpoints serialize
+                return [(dict(row._mapping), row.deleted_by_name) for row in rows], total
+
+            (items, total), statements = _count_statements(engine, page)
+
+        assert total == DOCUMENT_COUNT // 2
+        assert len(items) == min(limit, total)
+        counts[limit] = len(statements)
+
+    # the count and the page itself
+    assert set(counts.values()) == {2}, counts
+
+
+def test_statement_count_without_total(engine):
+    with Session(engine) as db:
+        (rows, total), statements = _count_statements(
+            engine, lambda: list_documents(db, True, limit=DOCUMENT_COUNT, with_total=False))
+
+    assert total is None
+    assert all(row.deleted_by_name == "staff2" for row in rows)
+    assert len(statements) == 1
@@ -0,0 +1,112 @@
+"""
+NameCache and resolve_many: expiry, LRU eviction, one load per batch, and
+invalidation of ORM writes only once they are committed.
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from db import name_cache
+from db.models.model_owner import GenderEnum, Owner
+from db.name_cache import NameCache, _MISS, owner_names, resolve_many
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(name_cache.time, "monotonic", clock)
+    return clock
+
+
+def test_found_name_expires_after_ttl(clock):
+    cache = NameCache(max_size=10, ttl_seconds=600, negative_ttl_seconds=30)
+    cache.put("a", "Ali Bin")
+
+    clock.now += 599
+    assert cache.get("a") == "Ali Bin"
+    clock.now += 2
+    assert cache.get("a") is _MISS
+
+
+def test_missing_key_expires_after_negative_ttl(clock):
+    cache = NameCache(max_size=10, ttl_seconds=600, negative_ttl_seconds=30)
+    cache.put("a", None)
+
+    clock.now += 29
+    assert cache.get("a") is None
+    clock.now += 2
+    assert cache.get("a") is _MISS
+
+
+def test_least_recently_used_key_is_evicted():
+    cache = NameCache(max_size=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    cache.get("a")
+    cache.put("c", "C")
+
+    assert cache.get("b") is _MISS
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.stats()["size"] == 2
+
+
+def test_resolve_many_loads_each_batch_once():
+    cache = NameCache()
+    calls = []
+
+    def load(keys):
+        calls.append(sorted(keys))
+        return {key: key.upper() for key in keys if key != "unknown"}
+
+    assert resolve_many(cache, ["a", "b", "a", "unknown"], load) == {"a": "A", "b": "B", "unknown": None}
+    assert calls == [["a", "b", "unknown"]]
+
+    # cached names and the cached "does not exist" answer need no load at all
+    assert resolve_many(cache, ["a", "unknown"], load) == {"a": "A", "unknown": None}
+    assert resolve_many(cache, ["b", "c"], load) == {"b": "B", "c": "C"}
+    assert calls == [["a", "b", "unknown"], ["c"]]
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Owner.__table__.create(engine)
+    with Session(engine) as db:
+        db.add(Owner(owner_ic_no="900101-01-1111", first_name="Ali", last_name="Bin", email="ali@example.com",
+                     date_of_birth=date(1990, 1, 1), gender=GenderEnum.male, nationality="MY"))
+        db.commit()
+        yield db
+    engine.dispose()
+    owner_names.invalidate()
+
+
+def test_write_is_invalidated_on_commit(db):
+    owner_names.put("900101-01-1111", "Ali Bin")
+    db.get(Owner, "900101-01-1111").last_name = "Abu"
+    db.flush()
+    # flushed but not committed, other sessions still read the old row
+    assert owner_names.get("900101-01-1111") == "Ali Bin"
+
+    db.commit()
+    assert owner_names.get("900101-01-1111") is _MISS
+
+
+def test_rolled_back_write_keeps_the_cache(db):
+    owner_names.put("900101-01-1111", "Ali Bin")
+    db.get(Owner, "900101-01-1111").last_name = "Abu"
+    db.flush()
+    db.rollback()
+    db.commit()
+
+    assert owner_names.get("900101-01-1111") == "Ali Bin"
@@ -2,6 +2,7 @@ import React, { useMemo } from "react";
 import ReactPaginate from "react-paginate";
 import { Link } from "react-router-dom";
 import { type DocumentRecord } from "../types/sharedInterface";
+import axiosClient from "../services/axiosClient";
 
 interface DocumentTableProps {
   documents: DocumentRecord[];
@@ -31,6 +32,7 @@ const TableComponent: React.FC<DocumentTableProps> = ({
         <table className="min-w-full table-fixed text-left border-collapse">
           <thead>
             <tr>
+              <th className="p-3 w-24">Preview</th>
               <th className="p-3 w-48">Doc Type</th>
               <th className="p-3 w-60">Owner Name</th>
               <th className="p-3 w-40">Owner IC</th>
@@ -52,9 +54,21 @@ const TableComponent: React.FC<DocumentTableProps> = ({
           <tbody>
             {documents.map((doc, index) => (
               <tr
-                key={doc.doc_record_id}
+                key={doc.doc_encrypted_id}
                 className={index % 2 === 0 ? "bg-white" : "bg-blue-50"}
               >
+                <td className="p-3">
+                  {/* first page, rendered by the backend; versioned by content so the browser caches it for good */}
+                  <img
+                    src={`${axiosClient.defaults.baseURL}/thumbnail/${doc.doc_encrypted_id}?v=${doc.thumbnail_version}`}
+                    alt={`${doc.document_type} preview`}
+                    loading="lazy"
+                    className="h-20 w-auto border border-gray-200 bg-white"
+                    onError={(e) => {
+                      e.currentTarget.style.visibility = "hidden";
+                    }}
+                  />
+                </td>
                 <td className="p-3">{doc.document_type}</td>
                 <td className="p-3 ">{doc.doc_owner_name}</td>
                 <td className="p-3 ">{doc.doc_owner_ic}</td>
@@ -7,6 +7,10 @@ export type Notification = {
   message: string;
   created_at: string;
   has_read?: boolean;
+  // > 1 when the backend merged a burst of events into this notification
+  item_count?: number;
+  detail?: string | null;
+  topic?: string | null;
 };
 
 type NotificationContextType = {
@@ -17,6 +21,9 @@ type NotificationContextType = {
   setNotifications: React.Dispatch<React.SetStateAction<Notification[]>>;
 };
 
+// must match CLOSE_EVICTED in backend/notification/websocket_manager.py
+const WS_CLOSE_EVICTED = 4001;
+
 const NotificationContext = createContext<NotificationContextType | undefined>(undefined);
 
 export const NotificationProvider = ({ children }: { children: React.ReactNode }) => {
@@ -32,43 +39,85 @@ export const NotificationProvider = ({ children }: { children: React.ReactNode }
   
     
 
+  // highest notification_id we hold, sent as ?last_seen_id= on reconnect so
+  // the backend only replays what we missed instead of the whole history
+  const lastSeenIdRef = useRef<number | null>(null);
+
+  const trackLastSeen = (list: Notification[]) => {
+    for (const n of list) {
+      const id = Number(n.notification_id);
+      if (!Number.isNaN(id) && (lastSeenIdRef.current === null || id > lastSeenIdRef.current)) {
+        lastSeenIdRef.current = id;
+      }
+    }
+  };
+
   useEffect(() => {
     if (!user?.id) {
       console.log("WebSocket skipped: user not loaded yet");
       return;
     }
-  
-    const wsUrl = `${import.meta.env.VITE_WEBSOCKET_URL}/ws/${user.id}`;
-    console.log("Connecting WebSocket to", wsUrl);
-  
-    const ws = new WebSocket(wsUrl);
-    wsRef.current = ws;
-  
-    ws.onopen = () => {
-      console.log("WebSocket connected for user", user.id);
-    };
-  
-    ws.onmessage = (event) => {
-      try {
-        const data = JSON.parse(event.data);
-        if (!data.notification_id || !data.created_at) {
-          console.warn("Skipping invalid notification", data);
-          return;
+
+    let closedByUs = false;
+    let retryDelay = 1000;
+    let retryTimer: ReturnType<typeof setTimeout> | null = null;
+
+    const connect = () => {
+      const resume =
+        lastSeenIdRef.current !== null ? `?last_seen_id=${lastSeenIdRef.current}` : "";
+      const wsUrl = `${import.meta.env.VITE_WEBSOCKET_URL}/ws/${user.id}${resume}`;
+      console.log("Connecting WebSocket to", wsUrl);
+
+      const ws = new WebSocket(wsUrl);
+      wsRef.current = ws;
+
+      ws.onopen = () => {
+        console.log("WebSocket connected for user", user.id);
+        retryDelay = 1000;
+      };
+
+      ws.onmessage = (event) => {
+        try {
+          const data = JSON.parse(event.data);
+          // server heartbeat, answering keeps this socket from being reaped
+          if (data.type === "ping") {
+            ws.send(JSON.stringify({ type: "pong" }));
+            return;
+          }
+          if (!data.notification_id || !data.created_at) {
+            console.warn("Skipping invalid notification", data);
+            return;
+          }
+
+          trackLastSeen([data]);
+          // a notification can arrive both live and via the resume replay
+          setNotifications((prev) =>
+            prev.some((n) => n.notification_id === data.notification_id)
+              ? prev
+              : sortByNewest([data, ...prev])
+          );
+
+        } catch (err) {
+          console.error("WebSocket error:", err);
         }
-    
-        setNotifications((prev) => sortByNewest([data, ...prev]));
+      };
 
-      } catch (err) {
-        console.error("WebSocket error:", err);
-      }
+      ws.onclose = (event) => {
+        console.log("WebSocket closed");
+        if (closedByUs) return;
+        // 4001: evicted by a newer tab of this account, reconnecting would evict that one in turn
+        if (event.code === WS_CLOSE_EVICTED) return;
+        retryTimer = setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 30000);
+      };
     };
-    
-    
-  
-    ws.onclose = () => console.log("WebSocket closed");
-  
+
+    connect();
+
     return () => {
-      ws.close();
+      closedByUs = true;
+      if (retryTimer) clearTimeout(retryTimer);
+      wsRef.current?.close();
       console.log("WebSocket disconnected");
     };
   }, [user?.id]);
@@ -79,6 +128,7 @@ export const NotificationProvider = ({ children }: { children: React.ReactNode }
       try {
         const res = await axiosClient.get(`/notifications/${user.id}`);
         const sorted = sortByNewest(res.data); // use the updated helper here
+        trackLastSeen(sorted);
         setNotifications(sorted);
       } catch (err) {
         console.error("Failed to fetch notifications", err);
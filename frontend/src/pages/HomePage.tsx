@@ -9,7 +9,6 @@ import axios from "axios";
 import { toast } from "react-toastify";
 
 interface DocumentRecord {
-  doc_record_id: string;
   doc_encrypted_id: string,
   doc_owner_name: string;
   doc_owner_ic: string;
@@ -1,5 +1,4 @@
 export interface DocumentRecord {
-    doc_record_id: string;
     doc_encrypted_id: string;
     doc_owner_name: string;
     doc_owner_ic: string;
@@ -12,4 +11,5 @@ export interface DocumentRecord {
     deleted_by: string;
     deleted_by_name: string;
     deleted_at: string;
+    thumbnail_version: string;
   }
\ No newline at end of file